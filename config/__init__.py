@@ -1,16 +1,53 @@
 """Configuration management for Playwright-Async-Crawler-Suite."""
 
-import yaml
+import copy
 import os
+import re
+import yaml
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, Callable, Dict, Tuple
+
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+# Parsed YAML keyed by resolved path -> (mtime_ns, size, raw config)
+_CONFIG_CACHE: "OrderedDict[str, Tuple[int, int, Any]]" = OrderedDict()
+_CONFIG_CACHE_SIZE = 32
+
+# Matches a whole-value ${VAR_NAME} or ${VAR_NAME:default} reference
+_ENV_VAR_RE = re.compile(r'^\$\{([^:}]+)(?::([^}]*))?\}$')
+
+# Strings accepted for boolean settings, as ${VAR} substitution produces them
+_BOOL_STRINGS = ('true', 'false')
+
+_REQUIRED_SECTIONS = ('browser', 'anti_detection', 'output', 'logging')
 
+# (key path, error message) pairs checked in order by validate_config
+_REQUIRED_KEYS: Tuple[Tuple[Tuple[str, ...], str], ...] = tuple(
+    ((section,), f"Missing required config section: {section}")
+    for section in _REQUIRED_SECTIONS
+) + (
+    (('browser', 'headless'), "Missing required browser.headless setting"),
+    (('anti_detection', 'max_concurrent'), "Missing required anti_detection.max_concurrent setting"),
+)
 
-def load_config(config_path: str = None) -> Dict[str, Any]:
-    """Load configuration from YAML file.
+_FAST_VALIDATION_ERROR = (
+    "Missing required config settings: browser.headless, anti_detection.max_concurrent, "
+    "output and logging are required (use validate_config() for details)"
+)
+
+
+def load_config(config_path: str = None, strict: bool = False) -> Dict[str, Any]:
+    """Load and validate configuration from YAML file.
     
     Args:
         config_path: Path to config file. If None, uses default config.yaml
+        strict: Validate with validate_config() (per-key messages and type
+            checks) instead of the fast required-keys check
         
     Returns:
         Configuration dictionary
@@ -18,6 +55,7 @@ def load_config(config_path: str = None) -> Dict[str, Any]:
     Raises:
         FileNotFoundError: If config file not found
         yaml.YAMLError: If config file is invalid
+        ValueError: If required settings are missing or invalid
     """
     if config_path is None:
         # Default to config.yaml in same directory
@@ -28,19 +66,42 @@ def load_config(config_path: str = None) -> Dict[str, Any]:
     if not config_path.exists():
         raise FileNotFoundError(f"Config file not found: {config_path}")
     
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+    cache_key = str(config_path.resolve())
+    st = config_path.stat()
+    cached = _CONFIG_CACHE.get(cache_key)
+    
+    if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+        _CONFIG_CACHE.move_to_end(cache_key)
+        raw_config = cached[2]
+    else:
+        with open(config_path, 'rb') as f:
+            raw_config = yaml.load(f, Loader=_Loader)
+        
+        _CONFIG_CACHE[cache_key] = (st.st_mtime_ns, st.st_size, raw_config)
+        _CONFIG_CACHE.move_to_end(cache_key)
+        if len(_CONFIG_CACHE) > _CONFIG_CACHE_SIZE:
+            _CONFIG_CACHE.popitem(last=False)
     
-    # Substitute environment variables
-    config = _substitute_env_vars(config)
+    # Copy so callers mutating the result can't corrupt the cache, then
+    # substitute environment variables on every load so env changes apply.
+    # An empty file loads as None; treat it as an empty config.
+    config = _substitute_env_vars(copy.deepcopy(raw_config) if raw_config is not None else {})
+    _normalize_headless(config)
+    
+    if strict:
+        validate_config(config)
+    else:
+        validate_config_fast(config)
     
     return config
 
 
 def _substitute_env_vars(config: Dict[str, Any]) -> Dict[str, Any]:
-    """Recursively substitute environment variables in config.
+    """Substitute environment variables in config, in place.
     
-    Supports ${VAR_NAME} and ${VAR_NAME:default} syntax.
+    Supports ${VAR_NAME} and ${VAR_NAME:default} syntax. Nested dicts and
+    lists are walked iteratively and string values are replaced in their
+    containers, so callers must pass a config they own.
     
     Args:
         config: Configuration dictionary
@@ -48,28 +109,67 @@ def _substitute_env_vars(config: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Configuration with environment variables substituted
     """
-    if isinstance(config, dict):
-        return {k: _substitute_env_vars(v) for k, v in config.items()}
-    elif isinstance(config, list):
-        return [_substitute_env_vars(item) for item in config]
-    elif isinstance(config, str):
-        # Simple environment variable substitution
-        if config.startswith('${') and config.endswith('}'):
-            var_expr = config[2:-1]
-            
-            # Check for default value
-            if ':' in var_expr:
-                var_name, default = var_expr.split(':', 1)
-                return os.getenv(var_name, default)
-            else:
-                return os.getenv(var_expr, config)
-        return config
-    else:
+    env_get = os.environ.get
+    
+    if isinstance(config, str):
+        return _expand_env_var(config, env_get)
+    if not isinstance(config, (dict, list)):
         return config
+    
+    stack = [config]
+    while stack:
+        container = stack.pop()
+        items = container.items() if isinstance(container, dict) else enumerate(container)
+        
+        for key, value in items:
+            if isinstance(value, str):
+                if '${' in value:
+                    container[key] = _expand_env_var(value, env_get)
+            elif isinstance(value, (dict, list)):
+                stack.append(value)
+    
+    return config
+
+
+def _normalize_headless(config: Any) -> None:
+    """Turn a "true"/"false" browser.headless string into a bool, in place.
+    
+    ${VAR} substitution yields strings, and a non-empty "false" would
+    otherwise launch the browser headless.
+    
+    Args:
+        config: Configuration loaded by load_config()
+    """
+    browser = config.get('browser') if isinstance(config, dict) else None
+    if isinstance(browser, dict):
+        headless = browser.get('headless')
+        if isinstance(headless, str) and headless.strip().lower() in _BOOL_STRINGS:
+            browser['headless'] = headless.strip().lower() == 'true'
+
+
+def _expand_env_var(value: str, env_get: Callable[..., Any] = os.environ.get) -> str:
+    """Expand a single ${VAR} or ${VAR:default} string.
+    
+    Args:
+        value: Raw string value from config
+        env_get: Environment lookup, bound once per substitution pass
+        
+    Returns:
+        Environment value, default, or the original string if unresolved
+    """
+    match = _ENV_VAR_RE.match(value)
+    if match is None:
+        return value
+    
+    var_name, default = match.group(1), match.group(2)
+    return env_get(var_name, value if default is None else default)
 
 
 def validate_config(config: Dict[str, Any]) -> bool:
-    """Validate configuration has required fields.
+    """Validate configuration has required fields with valid types.
+    
+    This is the strict validator: it reports exactly which setting is
+    missing and checks setting types.
     
     Args:
         config: Configuration dictionary
@@ -77,23 +177,59 @@ def validate_config(config: Dict[str, Any]) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    required_sections = ['browser', 'anti_detection', 'output', 'logging']
+    for path, message in _REQUIRED_KEYS:
+        section = config
+        for key in path[:-1]:
+            section = section[key]
+        if path[-1] not in section:
+            raise ValueError(message)
+    
+    # Env-var substitution yields strings, so accept "true"/"false" too;
+    # load_config() converts them to bool
+    headless = config['browser']['headless']
+    if isinstance(headless, str):
+        valid_headless = headless.strip().lower() in _BOOL_STRINGS
+    else:
+        valid_headless = isinstance(headless, bool)
+    if not valid_headless:
+        raise ValueError("Invalid browser.headless setting: must be true or false")
+    
+    # Likewise accept numeric strings for max_concurrent
+    max_concurrent = config['anti_detection']['max_concurrent']
+    try:
+        valid_max_concurrent = not isinstance(max_concurrent, bool) and int(max_concurrent) >= 1
+    except (TypeError, ValueError):
+        valid_max_concurrent = False
+    if not valid_max_concurrent:
+        raise ValueError("Invalid anti_detection.max_concurrent setting: must be a positive integer")
     
-    for section in required_sections:
-        if section not in config:
-            raise ValueError(f"Missing required config section: {section}")
+    return True
+
+
+def validate_config_fast(config: Dict[str, Any]) -> bool:
+    """Check that required settings are present, without diagnostics.
     
-    # Validate browser config
-    browser_config = config['browser']
-    if 'headless' not in browser_config:
-        raise ValueError("Missing required browser.headless setting")
+    Used by load_config() by default. Raises one generic error; call
+    validate_config() to find out which setting is missing.
     
-    # Validate anti_detection config
-    anti_detection = config['anti_detection']
-    if 'max_concurrent' not in anti_detection:
-        raise ValueError("Missing required anti_detection.max_concurrent setting")
+    Args:
+        config: Configuration dictionary
+        
+    Returns:
+        True if valid
+        
+    Raises:
+        ValueError: If any required setting is missing
+    """
+    try:
+        config['browser']['headless']
+        config['anti_detection']['max_concurrent']
+        config['output']
+        config['logging']
+    except (KeyError, TypeError):
+        raise ValueError(_FAST_VALIDATION_ERROR) from None
     
     return True
 
 
-__all__ = ['load_config', 'validate_config']
+__all__ = ['load_config', 'validate_config', 'validate_config_fast']
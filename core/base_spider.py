@@ -1,8 +1,10 @@
 """Abstract base class for all spiders."""
 
+import asyncio
 import logging
+import sys
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
 from pathlib import Path
 
 from core.browser import BrowserManager
@@ -23,6 +25,19 @@ class BaseSpider(ABC):
     - Common run() orchestration method
     """
 
+    # Subclasses that also declare __slots__ get instances without a __dict__,
+    # so their instance attributes can't be monkeypatched (patch the class
+    # instead); subclasses without __slots__ keep a __dict__ as usual
+    __slots__ = (
+        'browser',
+        'middleware',
+        'config',
+        'test_mode',
+        '_keyword_semaphore',
+        '_detail_semaphore',
+        '_result_buffer',
+    )
+
     def __init__(
         self,
         browser_manager: BrowserManager,
@@ -41,6 +56,12 @@ class BaseSpider(ABC):
         self.config = config
         self.test_mode = config.get('test_mode', False)
         
+        # Bound concurrent keywords and parse_detail calls. run() creates
+        # fresh ones each time, since on Python < 3.10 a semaphore is tied
+        # to the event loop it was created on.
+        self._keyword_semaphore: Optional[asyncio.Semaphore] = None
+        self._detail_semaphore: Optional[asyncio.Semaphore] = None
+        
         logger.info(f"Initialized {self.__class__.__name__} (test_mode={self.test_mode})")
 
     @abstractmethod
@@ -59,6 +80,23 @@ class BaseSpider(ABC):
         """
         raise NotImplementedError("Subclass must implement search()")
 
+    async def iter_search(self, keyword: str, **kwargs) -> AsyncIterator[List[Dict]]:
+        """Yield search results in batches as they become available.
+        
+        run() starts parsing each batch's details as soon as it is yielded.
+        The default yields search()'s whole result at once; spiders that
+        paginate can override this to yield page by page, so detail pages
+        load while later result pages are still being fetched.
+        
+        Args:
+            keyword: Search keyword
+            **kwargs: Additional search parameters
+            
+        Yields:
+            Lists of search result items
+        """
+        yield await self.search(keyword, **kwargs)
+
     @abstractmethod
     async def parse_detail(self, item: Dict) -> Dict:
         """Parse detail page and extract data.
@@ -97,8 +135,13 @@ class BaseSpider(ABC):
         
         This method provides the common workflow for all spiders:
         1. For each keyword, perform search
-        2. For each search result, parse detail page
-        3. Save all results to output file
+        2. Parse detail pages for all search results concurrently, starting
+           on each batch from iter_search() as soon as it arrives
+        3. Hand each keyword's results to append_results(), then
+           close_results() once all keywords are done
+        
+        Keywords are processed concurrently as well. Both keyword and
+        detail fan-out are bounded by anti_detection.max_concurrent.
         
         Args:
             keywords: List of keywords to search
@@ -117,6 +160,9 @@ class BaseSpider(ABC):
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         
+        self._keyword_semaphore = asyncio.Semaphore(self._get_concurrency_limit())
+        self._detail_semaphore = asyncio.Semaphore(self._get_detail_concurrency_limit())
+        
         stats = {
             'total_keywords': len(keywords),
             'total_items': 0,
@@ -124,56 +170,46 @@ class BaseSpider(ABC):
             'failed': 0,
             'errors': []
         }
+        # (keyword, item, message) tuples; turned into dicts before returning
+        errors: List[Tuple[Optional[str], Optional[Dict], str]] = []
         
-        all_results = []
+        results_file = str(output_path / f"results_{self.__class__.__name__}.xlsx")
         
         try:
-            for keyword in keywords:
-                logger.info(f"Processing keyword: {keyword}")
-                
-                try:
-                    # Step 1: Search
-                    search_results = await self.search(keyword, **kwargs)
-                    stats['total_items'] += len(search_results)
-                    logger.info(f"Found {len(search_results)} items for '{keyword}'")
-                    
-                    # Step 2: Parse details
-                    for item in search_results:
-                        try:
-                            detail_data = await self.parse_detail(item)
-                            detail_data['keyword'] = keyword
-                            all_results.append(detail_data)
-                            stats['successful'] += 1
-                            
-                        except Exception as e:
-                            logger.error(f"Failed to parse detail for item {item}: {e}")
-                            stats['failed'] += 1
-                            stats['errors'].append({
-                                'keyword': keyword,
-                                'item': item,
-                                'error': str(e)
-                            })
-                    
-                except Exception as e:
-                    logger.error(f"Failed to search for keyword '{keyword}': {e}")
-                    stats['errors'].append({
-                        'keyword': keyword,
-                        'error': str(e)
-                    })
-            
-            # Step 3: Save results
-            if all_results:
-                output_file = output_path / f"results_{self.__class__.__name__}.xlsx"
-                await self.save_results(all_results, str(output_file))
-                logger.info(f"Saved {len(all_results)} results to {output_file}")
+            await self.open_results(results_file)
+            
+            try:
+                outcomes = await asyncio.gather(
+                    *(self._process_keyword(keyword, results_file, kwargs) for keyword in keywords),
+                    return_exceptions=True
+                )
+            finally:
+                await self.close_results(results_file)
+            
+            # Merge per-keyword stats in keyword order
+            fatal_error = None
+            for outcome in outcomes:
+                if isinstance(outcome, BaseException):
+                    fatal_error = fatal_error or outcome
+                    continue
+                stats['total_items'] += outcome['total_items']
+                stats['successful'] += outcome['successful']
+                stats['failed'] += outcome['failed']
+                errors.extend(outcome['errors'])
+            
+            if fatal_error is not None:
+                raise fatal_error
+            
+            if stats['successful']:
+                logger.info(f"Saved {stats['successful']} results to {results_file}")
             else:
                 logger.warning("No results to save")
             
         except Exception as e:
             logger.error(f"Fatal error in run(): {e}", exc_info=True)
-            stats['errors'].append({
-                'error': f"Fatal error: {str(e)}"
-            })
+            errors.append((None, None, f"Fatal error: {str(e)}"))
+        
+        stats['errors'] = self._format_errors(errors)
         
         # Log summary
         logger.info(f"Execution complete: {stats['successful']} successful, "
@@ -181,6 +217,201 @@ class BaseSpider(ABC):
         
         return stats
 
+    async def _process_keyword(
+        self,
+        keyword: str,
+        output_path: str,
+        search_kwargs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Search one keyword, parse its results and append them to the sink.
+        
+        Args:
+            keyword: Search keyword
+            output_path: Path to output file
+            search_kwargs: Additional parameters passed to search()
+            
+        Returns:
+            Statistics for this keyword (total_items, successful, failed, errors),
+            with errors as (keyword, item, message) tuples
+        """
+        keyword_stats = {
+            'total_items': 0,
+            'successful': 0,
+            'failed': 0,
+            'errors': []
+        }
+        keyword_results = []
+        search_results: List[Dict] = []
+        detail_tasks: List[asyncio.Future] = []
+        # Every result for this keyword shares one interned key string
+        keyword = sys.intern(keyword)
+        
+        async with self._keyword_semaphore:
+            logger.info(f"Processing keyword: {keyword}")
+            batches = self.iter_search(keyword, **search_kwargs)
+            
+            try:
+                # Step 1: Search, starting on each batch's details (bounded by
+                # the detail semaphore) while later batches are still fetched
+                try:
+                    async for batch in batches:
+                        search_results.extend(batch)
+                        detail_tasks.extend(
+                            asyncio.ensure_future(self._parse_detail_bounded(item, keyword))
+                            for item in batch
+                        )
+                except Exception as e:
+                    logger.error(f"Failed to search for keyword '{keyword}': {e}")
+                    keyword_stats['errors'].append((keyword, None, str(e)))
+                
+                keyword_stats['total_items'] = len(search_results)
+                logger.info(f"Found {len(search_results)} items for '{keyword}'")
+                
+                # Step 2: Collect details of everything the search produced
+                detail_results = await asyncio.gather(*detail_tasks, return_exceptions=True)
+                
+                for item, detail_data in zip(search_results, detail_results):
+                    if isinstance(detail_data, Exception):
+                        logger.error(f"Failed to parse detail for item {item}: {detail_data}")
+                        keyword_stats['failed'] += 1
+                        keyword_stats['errors'].append((keyword, item, str(detail_data)))
+                    elif isinstance(detail_data, BaseException):
+                        raise detail_data
+                    else:
+                        keyword_results.append(detail_data)
+            
+            finally:
+                # Don't leave detail pages loading (or the search holding its
+                # page) if this keyword is cancelled
+                for task in detail_tasks:
+                    task.cancel()
+                await batches.aclose()
+        
+        # Step 3: Hand this keyword's results to the sink
+        if keyword_results:
+            await self.append_results(keyword_results, output_path)
+            keyword_stats['successful'] = len(keyword_results)
+        
+        return keyword_stats
+
+    @staticmethod
+    def _format_errors(
+        errors: List[Tuple[Optional[str], Optional[Dict], str]]
+    ) -> List[Dict[str, Any]]:
+        """Convert (keyword, item, message) error tuples to error dicts.
+        
+        Args:
+            errors: Error tuples collected during run()
+            
+        Returns:
+            List of dicts with 'error' plus 'keyword'/'item' where known
+        """
+        formatted = []
+        for keyword, item, message in errors:
+            error: Dict[str, Any] = {}
+            if keyword is not None:
+                error['keyword'] = keyword
+            if item is not None:
+                error['item'] = item
+            error['error'] = message
+            formatted.append(error)
+        return formatted
+
+    def _get_concurrency_limit(self) -> int:
+        """Get the configured concurrency limit for run()."""
+        return self.config.get('anti_detection', {}).get('max_concurrent', 3)
+
+    async def open_results(self, output_path: str) -> None:
+        """Prepare the results sink before run() processes any keyword.
+        
+        The default sink buffers results in memory and writes them with
+        save_results() on close. Spiders that can write incrementally
+        override open_results/append_results/close_results so memory stays
+        bounded by one keyword's results and partial output survives a crash.
+        
+        Args:
+            output_path: Path to output file
+        """
+        self._result_buffer: List[Dict] = []
+
+    async def append_results(self, data: List[Dict], output_path: str) -> None:
+        """Add a batch of results (one keyword's worth) to the sink.
+        
+        Args:
+            data: List of dictionaries containing extracted data
+            output_path: Path to output file
+        """
+        self._result_buffer.extend(data)
+
+    async def close_results(self, output_path: str) -> None:
+        """Flush and close the results sink.
+        
+        Args:
+            output_path: Path to output file
+        """
+        buffered, self._result_buffer = self._result_buffer, []
+        if buffered:
+            await self.save_results(buffered, output_path)
+
+    async def parse_details(self, items: List[Dict]) -> List[Any]:
+        """Parse many items concurrently under the detail concurrency limit.
+        
+        Args:
+            items: Search result items
+            
+        Returns:
+            Detail data in item order; an item whose parse_detail() raised
+            is represented by the exception instead
+        """
+        return await asyncio.gather(
+            *(self._parse_detail_limited(item) for item in items),
+            return_exceptions=True
+        )
+
+    def _get_detail_concurrency_limit(self) -> int:
+        """Get the limit on concurrent parse_detail calls.
+        
+        Defaults to the run() concurrency limit; spiders whose detail step
+        has a different cost profile (e.g. file downloads) can override it.
+        """
+        return self._get_concurrency_limit()
+
+    def _get_detail_semaphore(self) -> asyncio.Semaphore:
+        """Get the semaphore bounding concurrent parse_detail calls.
+        
+        run() creates it; it is created here when parse_details() is used
+        before any run().
+        """
+        if self._detail_semaphore is None:
+            self._detail_semaphore = asyncio.Semaphore(self._get_detail_concurrency_limit())
+        return self._detail_semaphore
+
+    async def _parse_detail_limited(self, item: Dict) -> Dict:
+        """Parse a single item under the detail concurrency limit.
+        
+        Args:
+            item: Search result item
+            
+        Returns:
+            Detail data
+        """
+        async with self._get_detail_semaphore():
+            return await self.parse_detail(item)
+
+    async def _parse_detail_bounded(self, item: Dict, keyword: str) -> Dict:
+        """Parse a single item under the detail concurrency limit.
+        
+        Args:
+            item: Search result item
+            keyword: Keyword the item was found for
+            
+        Returns:
+            Detail data tagged with the keyword
+        """
+        detail_data = await self._parse_detail_limited(item)
+        detail_data['keyword'] = keyword
+        return detail_data
+
     def _get_mock_data_path(self, filename: str) -> Path:
         """Get path to mock data file for test mode.
         
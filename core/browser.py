@@ -3,8 +3,10 @@
 import asyncio
 import logging
 import random
+from collections import deque
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import AsyncIterator, Deque, Dict, Any, Optional, List
 
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
 
@@ -22,8 +24,29 @@ class BrowserManager:
     - Configurable viewport and locale settings
     """
 
+    __slots__ = (
+        'playwright',
+        'browser',
+        'context',
+        'config',
+        'user_agents',
+        '_ua_idx',
+        'stealth_script',
+        '_blocked_resources',
+        '_context_options',
+        '_extra_contexts',
+        '_page_pool',
+        '_initialized',
+    )
+
     _instance: Optional['BrowserManager'] = None
-    _lock: asyncio.Lock = asyncio.Lock()
+    # Created lazily by _get_lock() for the running event loop
+    _lock: Optional[asyncio.Lock] = None
+    _lock_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    # File contents shared across instances/initialize() calls, keyed by path
+    _ua_cache: Dict[str, List[str]] = {}
+    _script_cache: Dict[str, str] = {}
 
     def __new__(cls):
         """Prevent direct instantiation."""
@@ -33,13 +56,20 @@ class BrowserManager:
 
     def __init__(self):
         """Initialize browser manager (only once due to singleton)."""
-        if not hasattr(self, '_initialized'):
+        try:
+            self._initialized
+        except AttributeError:
             self.playwright: Optional[Playwright] = None
             self.browser: Optional[Browser] = None
             self.context: Optional[BrowserContext] = None
             self.config: Dict[str, Any] = {}
             self.user_agents: List[str] = []
+            self._ua_idx = 0
             self.stealth_script: Optional[str] = None
+            self._blocked_resources: frozenset = frozenset()
+            self._context_options: Dict[str, Any] = {}
+            self._extra_contexts: List[BrowserContext] = []
+            self._page_pool: Deque[Page] = deque()
             self._initialized = False
 
     @classmethod
@@ -52,7 +82,7 @@ class BrowserManager:
         Returns:
             BrowserManager instance
         """
-        async with cls._lock:
+        async with cls._get_lock():
             if cls._instance is None:
                 cls._instance = cls()
             
@@ -62,6 +92,23 @@ class BrowserManager:
             
             return cls._instance
 
+    @classmethod
+    def _get_lock(cls) -> asyncio.Lock:
+        """Get the instance lock for the running event loop.
+        
+        Creating the lock at class definition would tie it to whichever loop
+        first touches it, which breaks callers (e.g. test suites) that run
+        on several loops in turn.
+        
+        Returns:
+            Lock guarding singleton initialization
+        """
+        loop = asyncio.get_running_loop()
+        if cls._lock is None or cls._lock_loop is not loop:
+            cls._lock = asyncio.Lock()
+            cls._lock_loop = loop
+        return cls._lock
+
     async def initialize(self, config: Dict[str, Any]) -> bool:
         """Initialize Playwright and browser context.
         
@@ -77,17 +124,24 @@ class BrowserManager:
 
         self.config = config
         browser_config = config.get('browser', {})
+        # Keep at most one idle page per concurrent worker
+        self._page_pool = deque(
+            maxlen=int(config.get('anti_detection', {}).get('max_concurrent', 3))
+        )
 
         try:
-            # Load User-Agent pool
-            await self._load_user_agents(browser_config.get('user_agents_file'))
-            
-            # Load stealth script
-            await self._load_stealth_script(browser_config.get('stealth_script'))
+            # Load User-Agent pool and stealth script while Playwright starts
+            asset_loads = asyncio.gather(
+                self._load_user_agents(browser_config.get('user_agents_file')),
+                self._load_stealth_script(browser_config.get('stealth_script')),
+            )
 
             # Start Playwright
-            logger.info("Starting Playwright...")
-            self.playwright = await async_playwright().start()
+            try:
+                logger.info("Starting Playwright...")
+                self.playwright = await async_playwright().start()
+            finally:
+                await asset_loads
 
             # Launch browser
             headless = browser_config.get('headless', False)
@@ -103,15 +157,28 @@ class BrowserManager:
                 ]
             }
 
+            # One context is shared by every page for the manager's lifetime,
+            # so connections and cache are reused across navigations
+            self._blocked_resources = frozenset(browser_config.get('block_resources') or ())
+            context_options = {
+                'viewport': browser_config.get('viewport'),
+                'locale': browser_config.get('locale', 'zh-CN'),
+                'timezone_id': browser_config.get('timezone', 'Asia/Shanghai'),
+            }
+            if self._blocked_resources:
+                # Requests served by a service worker bypass context.route(),
+                # so blocked resource types could still be fetched through one
+                context_options['service_workers'] = 'block'
+            # Kept for new_context(), so extra contexts are set up the same way
+            self._context_options = context_options
+
             if user_data_dir:
                 # Use persistent context with user data
                 logger.info(f"Launching persistent context with user data: {user_data_dir}")
                 self.context = await self.playwright.chromium.launch_persistent_context(
                     user_data_dir=user_data_dir,
                     **launch_options,
-                    viewport=browser_config.get('viewport'),
-                    locale=browser_config.get('locale', 'zh-CN'),
-                    timezone_id=browser_config.get('timezone', 'Asia/Shanghai'),
+                    **context_options,
                     ignore_https_errors=True,
                 )
             else:
@@ -121,24 +188,14 @@ class BrowserManager:
                 
                 # Create context
                 self.context = await self.browser.new_context(
-                    viewport=browser_config.get('viewport'),
-                    locale=browser_config.get('locale', 'zh-CN'),
-                    timezone_id=browser_config.get('timezone', 'Asia/Shanghai'),
+                    **context_options,
                     user_agent=self.get_random_user_agent(),
                 )
 
             # Set up resource blocking
-            block_resources = browser_config.get('block_resources', [])
-            if block_resources:
-                await self.context.route(
-                    "**/*",
-                    lambda route: (
-                        route.abort()
-                        if route.request.resource_type in block_resources
-                        else route.continue_()
-                    )
-                )
-                logger.info(f"Blocking resources: {block_resources}")
+            if self._blocked_resources:
+                await self.context.route("**/*", self._route_handler)
+                logger.info(f"Blocking resources: {sorted(self._blocked_resources)}")
 
             self._initialized = True
             logger.info("Browser manager initialized successfully")
@@ -149,6 +206,81 @@ class BrowserManager:
             await self.close()
             return False
 
+    async def new_context(self) -> BrowserContext:
+        """Create an additional, isolated context alongside the managed one.
+        
+        The context gets the same viewport, locale, stealth script and
+        resource blocking as the managed context, but its own User-Agent,
+        cookies and connection pool. It is closed by close().
+        
+        Returns:
+            New BrowserContext instance
+            
+        Raises:
+            RuntimeError: If browser manager not initialized, or running a
+                persistent context (which has no Browser to create contexts from)
+        """
+        if not self._initialized or not self.browser:
+            raise RuntimeError("Isolated contexts need an initialized, non-persistent browser.")
+
+        context = await self.browser.new_context(
+            **self._context_options,
+            user_agent=self.get_random_user_agent(),
+        )
+        try:
+            # Registered once on the context instead of on each of its pages
+            if self.stealth_script:
+                await context.add_init_script(self.stealth_script)
+            if self._blocked_resources:
+                await context.route("**/*", self._route_handler)
+        except Exception:
+            await context.close()
+            raise
+
+        self._extra_contexts.append(context)
+        return context
+
+    async def reset_context(self) -> None:
+        """Replace the managed context with a fresh one, keeping the browser.
+        
+        Cookies, storage and pooled pages are discarded, while the Playwright
+        driver and browser processes keep running, so this is much cheaper
+        than close() followed by initialize().
+        
+        Raises:
+            RuntimeError: If browser manager not initialized, or running a
+                persistent context (whose storage lives in user_data_dir)
+        """
+        if not self._initialized or not self.browser:
+            raise RuntimeError("Resetting the context needs an initialized, non-persistent browser.")
+
+        # Pooled pages belong to the old context and close with it
+        self._page_pool.clear()
+        context, self.context = self.context, None
+        if context:
+            await context.close()
+
+        self.context = await self.browser.new_context(
+            **self._context_options,
+            user_agent=self.get_random_user_agent(),
+        )
+        if self._blocked_resources:
+            await self.context.route("**/*", self._route_handler)
+
+    async def _route_handler(self, route) -> None:
+        """Abort requests for blocked resource types, pass everything else.
+        
+        Registered once per context and called for every network request,
+        so it is kept to a single set lookup.
+        
+        Args:
+            route: Playwright route for the intercepted request
+        """
+        if route.request.resource_type in self._blocked_resources:
+            await route.abort()
+        else:
+            await route.continue_()
+
     async def _load_user_agents(self, file_path: Optional[str]) -> None:
         """Load User-Agent strings from file.
         
@@ -162,21 +294,32 @@ class BrowserManager:
                 "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
                 "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
             ]
+            self._shuffle_user_agents()
             logger.info("Using default User-Agent pool")
             return
 
         try:
             ua_path = Path(file_path)
-            if ua_path.exists():
-                with open(ua_path, 'r', encoding='utf-8') as f:
-                    self.user_agents = [
-                        line.strip() for line in f
-                        if line.strip() and not line.startswith('#')
-                    ]
-                logger.info(f"Loaded {len(self.user_agents)} User-Agents from {file_path}")
-            else:
-                logger.warning(f"User-Agent file not found: {file_path}, using defaults")
-                await self._load_user_agents(None)
+            user_agents = self._ua_cache.get(str(ua_path))
+            
+            if user_agents is None:
+                try:
+                    content = await self._read_text(ua_path)
+                except FileNotFoundError:
+                    logger.warning(f"User-Agent file not found: {file_path}, using defaults")
+                    await self._load_user_agents(None)
+                    return
+                
+                user_agents = [
+                    line.strip() for line in content.splitlines()
+                    if line.strip() and not line.startswith('#')
+                ]
+                BrowserManager._ua_cache[str(ua_path)] = user_agents
+            
+            # Copy so shuffling doesn't reorder the shared cache
+            self.user_agents = list(user_agents)
+            self._shuffle_user_agents()
+            logger.info(f"Loaded {len(self.user_agents)} User-Agents from {file_path}")
         except Exception as e:
             logger.error(f"Error loading User-Agents: {e}")
             await self._load_user_agents(None)
@@ -193,20 +336,44 @@ class BrowserManager:
 
         try:
             script_path = Path(file_path)
-            if script_path.exists():
-                with open(script_path, 'r', encoding='utf-8') as f:
-                    self.stealth_script = f.read()
-                logger.info(f"Loaded stealth script from {file_path}")
-            else:
-                logger.warning(f"Stealth script not found: {file_path}")
+            stealth_script = self._script_cache.get(str(script_path))
+            
+            if stealth_script is None:
+                try:
+                    stealth_script = await self._read_text(script_path)
+                except FileNotFoundError:
+                    logger.warning(f"Stealth script not found: {file_path}")
+                    return
+                
+                BrowserManager._script_cache[str(script_path)] = stealth_script
+            
+            self.stealth_script = stealth_script
+            logger.info(f"Loaded stealth script from {file_path}")
         except Exception as e:
             logger.error(f"Error loading stealth script: {e}")
 
+    @staticmethod
+    async def _read_text(path: Path) -> str:
+        """Read a UTF-8 text file without blocking the event loop.
+        
+        Args:
+            path: File to read
+            
+        Returns:
+            File contents
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, path.read_text, 'utf-8')
+
     async def get_page(self) -> Page:
-        """Get a new page from the managed context.
+        """Get a page from the managed context.
+        
+        Idle pages handed back via release_page() are reused before a new
+        one is created, so the stealth init script is only registered once
+        per page lifetime.
         
         Returns:
-            New Page instance
+            Page instance
             
         Raises:
             RuntimeError: If browser manager not initialized
@@ -214,6 +381,19 @@ class BrowserManager:
         if not self._initialized or not self.context:
             raise RuntimeError("Browser manager not initialized. Call initialize() first.")
 
+        while self._page_pool:
+            page = self._page_pool.pop()
+            if not page.is_closed():
+                return page
+
+        return await self._new_page()
+
+    async def _new_page(self) -> Page:
+        """Create a new page in the managed context with stealth injected.
+        
+        Returns:
+            New Page instance
+        """
         page = await self.context.new_page()
         
         # Inject stealth script if available
@@ -222,6 +402,81 @@ class BrowserManager:
 
         return page
 
+    @asynccontextmanager
+    async def acquire_page(self) -> AsyncIterator[Page]:
+        """Borrow a page for the duration of an ``async with`` block.
+        
+        The page is handed back via release_page() even if the block raises.
+        
+        Yields:
+            Page instance
+        """
+        page = await self.get_page()
+        try:
+            yield page
+        finally:
+            await self.release_page(page)
+
+    async def warm_up(self, count: Optional[int] = None) -> None:
+        """Pre-create idle pages so early requests skip page creation.
+        
+        Args:
+            count: Number of idle pages to have ready (defaults to, and is
+                capped at, the pool size)
+            
+        Raises:
+            RuntimeError: If browser manager not initialized
+        """
+        if not self._initialized or not self.context:
+            raise RuntimeError("Browser manager not initialized. Call initialize() first.")
+
+        pool_size = self._page_pool.maxlen or 0
+        count = pool_size if count is None else min(count, pool_size)
+        missing = count - len(self._page_pool)
+        if missing <= 0:
+            return
+
+        pages = await asyncio.gather(*(self._new_page() for _ in range(missing)))
+        
+        # Pages released while these were being created may have filled the
+        # pool; extending a full deque would silently drop open pages
+        room = pool_size - len(self._page_pool)
+        for page in pages[room:]:
+            await page.close()
+        self._page_pool.extend(pages[:room])
+        logger.info(f"Warmed up {min(len(pages), room)} pages")
+
+    async def release_page(self, page: Page) -> None:
+        """Return a page obtained from get_page() for reuse.
+        
+        The page is reset to about:blank and kept in the pool; it is closed
+        instead if the pool is full or the reset fails.
+        
+        Args:
+            page: Page to release
+        """
+        if page.is_closed():
+            return
+
+        if not self._initialized or len(self._page_pool) == self._page_pool.maxlen:
+            await page.close()
+            return
+
+        try:
+            await page.goto("about:blank")
+        except Exception as e:
+            logger.debug(f"Failed to reset page, closing it: {e}")
+            await page.close()
+            return
+
+        # Other releasers may have filled the pool during the reset; the
+        # deque would otherwise drop its oldest page without closing it
+        if not self._initialized or len(self._page_pool) == self._page_pool.maxlen:
+            await page.close()
+            return
+
+        self._page_pool.append(page)
+
     async def inject_stealth(self, page: Page) -> None:
         """Inject stealth.min.js into page.
         
@@ -237,22 +492,47 @@ class BrowserManager:
         except Exception as e:
             logger.error(f"Failed to inject stealth script: {e}")
 
+    def _shuffle_user_agents(self) -> None:
+        """Shuffle the User-Agent pool and restart the rotation."""
+        random.shuffle(self.user_agents)
+        self._ua_idx = 0
+
     def get_random_user_agent(self) -> str:
         """Get random User-Agent from pool.
         
+        The pool is shuffled once on load and then walked as a ring, so each
+        call is an index bump rather than an RNG draw. The pool is reshuffled
+        every time the ring wraps around.
+        
         Returns:
             Random User-Agent string
         """
         if not self.user_agents:
             return "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         
-        return random.choice(self.user_agents)
+        if self._ua_idx >= len(self.user_agents):
+            previous = self.user_agents[-1]
+            self._shuffle_user_agents()
+            # Don't hand out the same User-Agent twice in a row across the wrap
+            if self.user_agents[0] == previous:
+                self.user_agents[0], self.user_agents[-1] = self.user_agents[-1], self.user_agents[0]
+        
+        user_agent = self.user_agents[self._ua_idx]
+        self._ua_idx += 1
+        return user_agent
 
     async def close(self) -> None:
         """Close browser context and cleanup resources."""
         logger.info("Closing browser manager...")
         
         try:
+            # Pooled pages are closed along with their context
+            self._page_pool.clear()
+            
+            extra_contexts, self._extra_contexts = self._extra_contexts, []
+            for context in extra_contexts:
+                await context.close()
+            
             if self.context:
                 await self.context.close()
                 self.context = None
@@ -3,19 +3,172 @@
 import asyncio
 import random
 import logging
+import re
 import time
-from typing import Callable, Any, Optional, Dict, List
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Any, Deque, Optional, Dict, List, Tuple, Type
 from functools import wraps
+from urllib.parse import urlsplit
 
 from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 
 logger = logging.getLogger(__name__)
 
+# Number of precomputed random_delay() unit samples (a power of two)
+_DELAY_RING_SIZE = 4096
+
+# Common CAPTCHA widgets
+_CAPTCHA_SELECTORS = (
+    'iframe[src*="recaptcha"]',
+    'iframe[src*="hcaptcha"]',
+    'div[class*="captcha"]',
+    'div[id*="captcha"]',
+    '#captcha',
+    '.g-recaptcha',
+    '.h-captcha',
+)
+
+# Combined so a single query_selector_all() round-trip finds any of them
+_CAPTCHA_SELECTOR = ", ".join(_CAPTCHA_SELECTORS)
+
+# CAPTCHA-related page text ("recaptcha"/"hcaptcha" are covered by "captcha")
+_CAPTCHA_RE = re.compile(r'captcha|verify you are human', re.IGNORECASE)
+
+# Searches the serialized DOM in the page and returns only the match (or
+# null), so the HTML itself never crosses the CDP bridge
+_FIND_IN_HTML_JS = """(pattern) => {
+    const match = document.documentElement.outerHTML.match(new RegExp(pattern, 'i'));
+    return match ? match[0] : null;
+}"""
+
+# Default close buttons tried by handle_popup(), in order of preference
+_POPUP_CLOSE_SELECTORS = (
+    'button:has-text("关闭")',
+    'button:has-text("Close")',
+    'button.close',
+    '[aria-label*="close" i]',
+    '.modal-close',
+    'div[role="dialog"] button',
+)
+
+# Installs a MutationObserver on first call (per document) and returns the
+# milliseconds since the DOM last changed
+_DOM_QUIET_MS_JS = """() => {
+    if (window.__lastMutation === undefined) {
+        window.__lastMutation = Date.now();
+        new MutationObserver(() => { window.__lastMutation = Date.now(); }).observe(
+            document,
+            {childList: true, subtree: true, attributes: true, characterData: true}
+        );
+    }
+    return Date.now() - window.__lastMutation;
+}"""
+
+
+class ConcurrencyLimiter:
+    """Async concurrency limiter whose limit can be changed at runtime.
+    
+    Works like asyncio.Semaphore (including ``async with``), but tracks the
+    number of active holders explicitly so the limit can be raised or
+    lowered safely while tasks are waiting. Waiters queue in FIFO order and
+    a freed slot is handed straight to the next one.
+    """
+
+    def __init__(self, limit: int):
+        """Initialize limiter.
+        
+        Args:
+            limit: Maximum number of concurrent holders
+        """
+        self._limit = limit
+        self._active = 0
+        # Futures of queued acquire() calls, resolved once a slot is theirs
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def limit(self) -> int:
+        """Maximum number of concurrent holders."""
+        return self._limit
+
+    @property
+    def active(self) -> int:
+        """Number of current holders."""
+        return self._active
+
+    def _wake_waiters(self) -> None:
+        """Hand free slots to queued waiters, oldest first."""
+        while self._waiters and self._active < self._limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._active += 1
+                waiter.set_result(None)
+
+    async def acquire(self) -> None:
+        """Wait until below the limit, then take a slot."""
+        # Uncontended: take the slot without allocating a future. While
+        # others are queued the newcomer lines up behind them.
+        if not self._waiters and self._active < self._limit:
+            self._active += 1
+            return
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Cancelled after being handed a slot; pass it on
+                self._active -= 1
+                self._wake_waiters()
+            elif waiter in self._waiters:
+                # A release may already have popped and skipped it
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        """Give back a slot and wake one waiter, if any.
+        
+        Synchronous, like asyncio.Semaphore.release().
+        
+        Raises:
+            ValueError: If no slot is held
+        """
+        if self._active <= 0:
+            raise ValueError("ConcurrencyLimiter released too many times")
+        self._active -= 1
+        self._wake_waiters()
+
+    async def set_limit(self, limit: int) -> None:
+        """Change the limit and admit waiters that now fit.
+        
+        Lowering the limit doesn't interrupt current holders; new holders
+        are admitted once the active count drops below the new limit.
+        
+        Args:
+            limit: New maximum number of concurrent holders
+            
+        Raises:
+            ValueError: If limit is less than 1
+        """
+        if limit < 1:
+            raise ValueError(f"Concurrency limit must be at least 1, got {limit}")
+        self._limit = limit
+        self._wake_waiters()
+
+    async def __aenter__(self) -> 'ConcurrencyLimiter':
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
 
 class AntiDetectionMiddleware:
     """Middleware for handling anti-bot mechanisms.
     
     Provides reusable decorators and functions for:
+    - Global and per-host concurrency limits
     - Dynamic cookie handling
     - Random delays
     - Retry with exponential backoff
@@ -33,22 +186,48 @@ class AntiDetectionMiddleware:
         anti_detection_config = config.get('anti_detection', {})
         
         # Concurrency control
-        max_concurrent = anti_detection_config.get('max_concurrent', 3)
-        self.semaphore = asyncio.Semaphore(max_concurrent)
+        max_concurrent = int(anti_detection_config.get('max_concurrent', 3))
+        self.semaphore = ConcurrencyLimiter(max_concurrent)
+        
+        # Per-host limit, applied on top of the global one when a URL is known.
+        # Defaults to the global limit, so a single-host crawl isn't throttled.
+        self.per_host_concurrent = int(anti_detection_config.get('per_host_concurrent', max_concurrent))
+        # Semaphores of hosts with limit() calls in progress, and how many
+        # calls use each; an entry is dropped when its last call finishes
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._host_users: Dict[str, int] = {}
         
         # Delay configuration
         delay_config = anti_detection_config.get('request_delay', {})
         self.min_delay = delay_config.get('min', 1.0)
         self.max_delay = delay_config.get('max', 3.0)
+        # Precomputed samples from [0, 1), walked as a ring and scaled to
+        # the current [min_delay, max_delay] on each call
+        self._delay_ring = [random.random() for _ in range(_DELAY_RING_SIZE)]
+        self._delay_idx = 0
         
         # Retry configuration
         retry_config = anti_detection_config.get('retry', {})
         self.max_retries = retry_config.get('max_attempts', 3)
         self.backoff_factor = retry_config.get('backoff_factor', 2.0)
+        self.retry_base_delay = retry_config.get('base_delay', 1.0)
+        self.retry_max_delay = retry_config.get('max_delay', 30.0)
+        self.retry_jitter = retry_config.get('jitter', 0.5)
+        
+        logger.info("Middleware initialized: max_concurrent=%s, delay=%s-%ss, max_retries=%s",
+                    max_concurrent, self.min_delay, self.max_delay, self.max_retries)
+
+    async def set_max_concurrent(self, max_concurrent: int) -> None:
+        """Change the concurrency limit at runtime.
+        
+        Useful for backing off when the target starts rate limiting or
+        serving CAPTCHAs, and ramping up again afterwards.
         
-        logger.info(f"Middleware initialized: max_concurrent={max_concurrent}, "
-                   f"delay={self.min_delay}-{self.max_delay}s, "
-                   f"max_retries={self.max_retries}")
+        Args:
+            max_concurrent: New maximum number of concurrent executions
+        """
+        await self.semaphore.set_limit(max_concurrent)
+        logger.info("Concurrency limit set to %s", max_concurrent)
 
     async def with_retry(
         self,
@@ -56,49 +235,68 @@ class AntiDetectionMiddleware:
         *args,
         max_retries: Optional[int] = None,
         backoff_factor: Optional[float] = None,
+        retry_on: Tuple[Type[Exception], ...] = (Exception,),
         **kwargs
     ) -> Any:
         """Execute function with retry logic and exponential backoff.
         
+        The delay before retry n (0-based) is
+        base_delay * backoff_factor**n * (1 + U(0, jitter)), capped at
+        max_delay. Cancellation and KeyboardInterrupt are never retried.
+        
         Args:
             func: Async function to execute
             *args: Positional arguments for func
             max_retries: Maximum number of retry attempts (overrides config)
             backoff_factor: Backoff multiplier (overrides config)
+            retry_on: Exception types worth retrying; anything else is
+                raised on the first failure
             **kwargs: Keyword arguments for func
             
         Returns:
             Result from successful function execution
             
         Raises:
-            Exception: Last exception if all retries fail
+            Exception: Last exception if all retries fail, or the first
+                one that isn't an instance of retry_on
         """
         max_retries = max_retries or self.max_retries
         backoff_factor = backoff_factor or self.backoff_factor
+        fname = getattr(func, '__name__', repr(func))
         
         last_exception = None
         
         for attempt in range(max_retries):
             try:
-                logger.debug(f"Attempt {attempt + 1}/{max_retries} for {func.__name__}")
+                logger.debug("Attempt %d/%d for %s", attempt + 1, max_retries, fname)
                 result = await func(*args, **kwargs)
                 
                 if attempt > 0:
-                    logger.info(f"Success on attempt {attempt + 1} for {func.__name__}")
+                    logger.info("Success on attempt %d for %s", attempt + 1, fname)
                 
                 return result
                 
+            except (asyncio.CancelledError, KeyboardInterrupt):
+                raise
             except Exception as e:
+                if not isinstance(e, retry_on):
+                    logger.error("Not retrying %s after %s", fname, type(e).__name__)
+                    raise
+                
                 last_exception = e
-                logger.warning(f"Attempt {attempt + 1}/{max_retries} failed for {func.__name__}: {e}")
+                logger.warning("Attempt %d/%d failed for %s: %s", attempt + 1, max_retries, fname, e)
                 
                 if attempt < max_retries - 1:
                     # Calculate backoff delay
-                    delay = (backoff_factor ** attempt) + random.uniform(0, 1)
-                    logger.info(f"Retrying in {delay:.2f} seconds...")
+                    delay = min(
+                        self.retry_base_delay * (backoff_factor ** attempt)
+                        * (1 + random.uniform(0, self.retry_jitter)),
+                        self.retry_max_delay
+                    )
+                    logger.info("Retrying in %.2f seconds...", delay)
                     await asyncio.sleep(delay)
                 else:
-                    logger.error(f"All {max_retries} attempts failed for {func.__name__}")
+                    logger.error("All %d attempts failed for %s", max_retries, fname)
         
         raise last_exception
 
@@ -109,21 +307,32 @@ class AntiDetectionMiddleware:
     ) -> None:
         """Add random delay between requests.
         
+        Delays in the configured range are scaled from a ring of unit
+        samples drawn at init, so changes to min_delay/max_delay apply to
+        the next call; an explicit range draws a fresh sample.
+        
         Args:
             min_seconds: Minimum delay in seconds (overrides config)
             max_seconds: Maximum delay in seconds (overrides config)
         """
-        min_seconds = min_seconds or self.min_delay
-        max_seconds = max_seconds or self.max_delay
+        if min_seconds is None and max_seconds is None:
+            # Configured range: scale the next precomputed sample
+            i = self._delay_idx
+            self._delay_idx = (i + 1) & (_DELAY_RING_SIZE - 1)
+            delay = self.min_delay + (self.max_delay - self.min_delay) * self._delay_ring[i]
+        else:
+            min_seconds = min_seconds or self.min_delay
+            max_seconds = max_seconds or self.max_delay
+            delay = random.uniform(min_seconds, max_seconds)
         
-        delay = random.uniform(min_seconds, max_seconds)
-        logger.debug(f"Random delay: {delay:.2f}s")
+        logger.debug("Random delay: %.2fs", delay)
         await asyncio.sleep(delay)
 
     async def handle_dynamic_cookies(self, page: Page, timeout: int = 10000) -> bool:
         """Handle dynamic cookie acquisition.
         
-        Waits for cookie-setting scripts to execute and validates cookie presence.
+        Returns immediately if the context already has cookies; otherwise
+        waits for cookie-setting scripts to execute and validates cookie presence.
         
         Args:
             page: Playwright Page object
@@ -133,6 +342,12 @@ class AntiDetectionMiddleware:
             True if cookies were successfully set, False otherwise
         """
         try:
+            # Cookies often persist across navigations; skip the wait if so
+            cookies = await page.context.cookies()
+            if cookies:
+                logger.debug("Found %d cookies", len(cookies))
+                return True
+            
             logger.debug("Waiting for dynamic cookies...")
             
             # Wait for network to be idle (cookies usually set during initial load)
@@ -142,7 +357,7 @@ class AntiDetectionMiddleware:
             cookies = await page.context.cookies()
             
             if cookies:
-                logger.debug(f"Found {len(cookies)} cookies")
+                logger.debug("Found %d cookies", len(cookies))
                 return True
             else:
                 logger.warning("No cookies found after waiting")
@@ -152,7 +367,7 @@ class AntiDetectionMiddleware:
             logger.warning("Timeout waiting for dynamic cookies")
             return False
         except Exception as e:
-            logger.error(f"Error handling dynamic cookies: {e}")
+            logger.error("Error handling dynamic cookies: %s", e)
             return False
 
     async def detect_captcha(self, page: Page) -> bool:
@@ -165,39 +380,29 @@ class AntiDetectionMiddleware:
             True if CAPTCHA detected, False otherwise
         """
         try:
-            # Common CAPTCHA selectors
-            captcha_selectors = [
-                'iframe[src*="recaptcha"]',
-                'iframe[src*="hcaptcha"]',
-                'div[class*="captcha"]',
-                'div[id*="captcha"]',
-                '#captcha',
-                '.g-recaptcha',
-                '.h-captcha',
-            ]
-            
-            for selector in captcha_selectors:
-                try:
-                    element = await page.query_selector(selector)
-                    if element and await element.is_visible():
-                        logger.warning(f"CAPTCHA detected: {selector}")
-                        return True
-                except Exception:
-                    continue
+            # Look for visible CAPTCHA widgets
+            try:
+                elements = await page.query_selector_all(_CAPTCHA_SELECTOR)
+                visible = await asyncio.gather(
+                    *(element.is_visible() for element in elements),
+                    return_exceptions=True
+                )
+                if any(v is True for v in visible):
+                    logger.warning("CAPTCHA element detected")
+                    return True
+            except (PlaywrightTimeoutError, asyncio.TimeoutError):
+                pass
             
             # Check for CAPTCHA-related text
-            content = await page.content()
-            captcha_keywords = ['captcha', 'recaptcha', 'hcaptcha', 'verify you are human']
-            
-            for keyword in captcha_keywords:
-                if keyword.lower() in content.lower():
-                    logger.warning(f"CAPTCHA keyword detected: {keyword}")
-                    return True
+            match = await page.evaluate(_FIND_IN_HTML_JS, _CAPTCHA_RE.pattern)
+            if match:
+                logger.warning("CAPTCHA keyword detected: %s", match.lower())
+                return True
             
             return False
             
         except Exception as e:
-            logger.error(f"Error detecting CAPTCHA: {e}")
+            logger.error("Error detecting CAPTCHA: %s", e)
             return False
 
     async def wait_for_stable_dom(
@@ -208,6 +413,11 @@ class AntiDetectionMiddleware:
     ) -> None:
         """Wait for DOM to stabilize after dynamic loading.
         
+        A MutationObserver in the page records when the DOM last changed;
+        the DOM counts as stable once it has been quiet for three check
+        intervals. Each check is one small evaluate() call rather than a
+        full page.content() serialization.
+        
         Args:
             page: Playwright Page object
             timeout: Maximum wait time in milliseconds
@@ -219,52 +429,86 @@ class AntiDetectionMiddleware:
             # First wait for network idle
             await page.wait_for_load_state('networkidle', timeout=timeout)
             
-            # Then check for DOM stability
-            start_time = time.time()
-            previous_html_length = 0
-            stable_count = 0
-            required_stable_checks = 3
+            # Then wait until no mutations have been observed for a while
+            start_time = time.monotonic()
+            required_quiet_ms = 3 * check_interval
             
-            while (time.time() - start_time) * 1000 < timeout:
-                current_html = await page.content()
-                current_length = len(current_html)
+            while (time.monotonic() - start_time) * 1000 < timeout:
+                quiet_ms = await page.evaluate(_DOM_QUIET_MS_JS)
                 
-                if current_length == previous_html_length:
-                    stable_count += 1
-                    if stable_count >= required_stable_checks:
-                        logger.debug("DOM stabilized")
-                        return
-                else:
-                    stable_count = 0
+                if quiet_ms >= required_quiet_ms:
+                    logger.debug("DOM stabilized")
+                    return
                 
-                previous_html_length = current_length
-                await asyncio.sleep(check_interval / 1000)
+                # Sleep until the DOM would be stable if nothing else changes
+                await asyncio.sleep((required_quiet_ms - quiet_ms) / 1000)
             
             logger.warning("DOM did not stabilize within timeout")
             
         except PlaywrightTimeoutError:
             logger.warning("Timeout waiting for stable DOM")
         except Exception as e:
-            logger.error(f"Error waiting for stable DOM: {e}")
+            logger.error("Error waiting for stable DOM: %s", e)
+
+    @asynccontextmanager
+    async def limit(self, url: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold a global concurrency slot, and a per-host slot if url is given.
+        
+        The host slot is taken first so tasks queued on a busy host don't
+        tie up global slots other hosts could use.
+        
+        Args:
+            url: Request URL, if known
+        """
+        if not url:
+            async with self.semaphore:
+                yield
+            return
+        
+        host = urlsplit(url).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(self.per_host_concurrent)
+        self._host_users[host] = self._host_users.get(host, 0) + 1
+        try:
+            async with semaphore:
+                async with self.semaphore:
+                    yield
+        finally:
+            users = self._host_users[host] - 1
+            if users:
+                self._host_users[host] = users
+            else:
+                del self._host_users[host]
+                del self._host_semaphores[host]
 
     def with_concurrency_limit(self, func: Callable) -> Callable:
         """Decorator to limit concurrent executions.
         
+        The per-host limit is applied as well when the call has a ``url``
+        keyword argument or a URL string as its first positional argument.
+        
         Args:
             func: Async function to wrap
             
         Returns:
             Wrapped function with concurrency control
         """
+        fname = getattr(func, '__name__', repr(func))
+        
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            async with self.semaphore:
-                logger.debug(f"Acquired semaphore for {func.__name__}")
+            url = kwargs.get('url')
+            if url is None and args and isinstance(args[0], str) and '://' in args[0]:
+                url = args[0]
+            
+            async with self.limit(url):
+                logger.debug("Acquired semaphore for %s", fname)
                 try:
                     result = await func(*args, **kwargs)
                     return result
                 finally:
-                    logger.debug(f"Released semaphore for {func.__name__}")
+                    logger.debug("Released semaphore for %s", fname)
         
         return wrapper
 
@@ -287,13 +531,15 @@ class AntiDetectionMiddleware:
     def with_retry_decorator(
         self,
         max_retries: Optional[int] = None,
-        backoff_factor: Optional[float] = None
+        backoff_factor: Optional[float] = None,
+        retry_on: Tuple[Type[Exception], ...] = (Exception,)
     ) -> Callable:
         """Decorator factory for retry logic.
         
         Args:
             max_retries: Maximum number of retry attempts
             backoff_factor: Backoff multiplier
+            retry_on: Exception types worth retrying
             
         Returns:
             Decorator function
@@ -306,6 +552,7 @@ class AntiDetectionMiddleware:
                     *args,
                     max_retries=max_retries,
                     backoff_factor=backoff_factor,
+                    retry_on=retry_on,
                     **kwargs
                 )
             return wrapper
@@ -317,34 +564,39 @@ class AntiDetectionMiddleware:
         Args:
             page: Playwright Page object
             close_selectors: List of selectors for close buttons
+                (defaults to _POPUP_CLOSE_SELECTORS)
             
         Returns:
             True if popup was closed, False otherwise
         """
         if close_selectors is None:
-            close_selectors = [
-                'button:has-text("关闭")',
-                'button:has-text("Close")',
-                'button.close',
-                '[aria-label*="close" i]',
-                '.modal-close',
-                'div[role="dialog"] button',
-            ]
+            close_selectors = _POPUP_CLOSE_SELECTORS
         
         try:
-            for selector in close_selectors:
+            # Probe all close buttons at once rather than one timeout at a time
+            buttons = [page.locator(selector).first for selector in close_selectors]
+            visibility = await asyncio.gather(
+                *(button.is_visible(timeout=2000) for button in buttons),
+                return_exceptions=True
+            )
+            
+            for selector, button, visible in zip(close_selectors, buttons, visibility):
+                if visible is not True:
+                    continue
                 try:
-                    button = page.locator(selector).first
-                    if await button.is_visible(timeout=2000):
-                        await button.click()
-                        logger.info(f"Closed popup using selector: {selector}")
-                        await asyncio.sleep(1)
-                        return True
-                except Exception:
+                    await button.click()
+                except (PlaywrightTimeoutError, asyncio.TimeoutError):
                     continue
+                
+                logger.info("Closed popup using selector: %s", selector)
+                try:
+                    await page.wait_for_load_state('domcontentloaded', timeout=2000)
+                except PlaywrightTimeoutError:
+                    pass
+                return True
             
             return False
             
         except Exception as e:
-            logger.error(f"Error handling popup: {e}")
+            logger.error("Error handling popup: %s", e)
             return False
@@ -2,9 +2,10 @@
 
 import asyncio
 import logging
+from contextlib import AsyncExitStack
 from pathlib import Path
 import sys
-import pandas as pd
+from openpyxl import load_workbook
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -20,10 +21,40 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Detail results are appended to the keyword's workbook every this many items
+SAVE_BATCH_SIZE = 5
 
-def load_keywords_from_excel(excel_path: str, sheet_name: str = 'Sheet1', column_name: str = '成分名称') -> list:
+
+def _read_keyword_column(excel_path: str, sheet_name: str, column_name: str) -> list:
+    """Read the non-empty, stripped values of one column from an Excel sheet.
+    
+    Uses openpyxl's read-only mode so rows are streamed rather than the
+    whole workbook being loaded into memory.
+    """
+    workbook = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        header = next(rows, ())
+        idx = header.index(column_name)
+        
+        keywords = []
+        for row in rows:
+            value = row[idx] if idx < len(row) else None
+            if value is not None:
+                keyword = str(value).strip()
+                if keyword:
+                    keywords.append(keyword)
+        return keywords
+    finally:
+        workbook.close()
+
+
+async def load_keywords_from_excel(excel_path: str, sheet_name: str = 'Sheet1', column_name: str = '成分名称') -> list:
     """Load keywords from Excel file.
     
+    The file is parsed in the default executor so the event loop stays
+    responsive.
+    
     Args:
         excel_path: Path to Excel file
         sheet_name: Sheet name
@@ -33,9 +64,10 @@ def load_keywords_from_excel(excel_path: str, sheet_name: str = 'Sheet1', column
         List of keywords
     """
     try:
-        df = pd.read_excel(excel_path, sheet_name=sheet_name)
-        keywords = df[column_name].dropna().astype(str).str.strip().tolist()
-        keywords = [k for k in keywords if k]  # Remove empty strings
+        loop = asyncio.get_running_loop()
+        keywords = await loop.run_in_executor(
+            None, _read_keyword_column, excel_path, sheet_name, column_name
+        )
         logger.info(f"Loaded {len(keywords)} keywords from {excel_path}")
         return keywords
     except Exception as e:
@@ -46,82 +78,94 @@ def load_keywords_from_excel(excel_path: str, sheet_name: str = 'Sheet1', column
 async def main():
     """Main execution function."""
     try:
-        # Load configuration
-        logger.info("Loading configuration...")
-        config = load_config()
-        
-        # Override with example settings
-        config['test_mode'] = False  # Set to True for testing
-        config['spiders'] = {
-            'ingredient': {
-                'base_url': 'https://www.nmpa.gov.cn',
-                'search_url': 'https://www.nmpa.gov.cn/datasearch/home-index.html',
-                'search_type': 'domestic',  # or 'overseas'
-                'batch_size': 50
+        async with AsyncExitStack() as stack:
+            # Load configuration
+            logger.info("Loading configuration...")
+            config = load_config()
+            
+            # Override with example settings
+            config['test_mode'] = False  # Set to True for testing
+            config['spiders'] = {
+                'ingredient': {
+                    'base_url': 'https://www.nmpa.gov.cn',
+                    'search_url': 'https://www.nmpa.gov.cn/datasearch/home-index.html',
+                    'search_type': 'domestic',  # or 'overseas'
+                    'batch_size': 50
+                }
             }
-        }
-        
-        # Initialize components
-        logger.info("Initializing browser and middleware...")
-        browser = await BrowserManager.get_instance(config)
-        middleware = AntiDetectionMiddleware(config)
-        
-        # Create spider
-        logger.info("Creating IngredientSpider...")
-        spider = IngredientSpider(browser, middleware, config)
-        
-        # Load keywords from Excel (or use hardcoded list)
-        # keywords = load_keywords_from_excel('keywords.xlsx', column_name='成分名称')
-        
-        # For this example, use hardcoded keywords
-        keywords = [
-            '阿司匹林',
-            '对乙酰氨基酚',
-            '布洛芬',
-        ]
-        
-        logger.info(f"Starting scraping for {len(keywords)} keywords...")
-        
-        # Process each keyword
-        for idx, keyword in enumerate(keywords, 1):
-            logger.info(f"Processing keyword {idx}/{len(keywords)}: {keyword}")
             
-            try:
-                # Search
-                results = await spider.search(keyword, search_type='domestic')
-                logger.info(f"Found {len(results)} results for '{keyword}'")
-                
-                # Parse details (limit to first 10 for example)
-                detailed_results = []
-                for item in results[:10]:
-                    detail = await spider.parse_detail(item)
-                    detailed_results.append(detail)
-                
-                # Save incremental batch
-                if detailed_results:
-                    await spider.save_incremental_batch(
-                        detailed_results,
-                        keyword=keyword,
-                        batch_num=idx
-                    )
+            # Initialize components
+            logger.info("Initializing browser and middleware...")
+            browser = await BrowserManager.get_instance(config)
+            stack.push_async_callback(browser.close)
+            await browser.warm_up()  # Pre-create one page per concurrent worker
+            middleware = AntiDetectionMiddleware(config)
+            
+            # Create spider
+            logger.info("Creating IngredientSpider...")
+            spider = IngredientSpider(browser, middleware, config)
+            
+            # Load keywords from Excel (or use hardcoded list)
+            # keywords = await load_keywords_from_excel('keywords.xlsx', column_name='成分名称')
+            
+            # For this example, use hardcoded keywords
+            keywords = [
+                '阿司匹林',
+                '对乙酰氨基酚',
+                '布洛芬',
+            ]
+            
+            logger.info(f"Starting scraping for {len(keywords)} keywords...")
+            
+            # Process keywords concurrently, bounded by anti_detection.max_concurrent
+            @middleware.with_concurrency_limit
+            async def process_keyword(idx: int, keyword: str) -> None:
+                logger.info(f"Processing keyword {idx}/{len(keywords)}: {keyword}")
                 
-                # Random delay between keywords
-                await middleware.random_delay(2.0, 5.0)
+                try:
+                    # Search
+                    results = await spider.search(keyword, search_type='domestic')
+                    logger.info(f"Found {len(results)} results for '{keyword}'")
+                    
+                    # Parse details (limit to first 10 for example) in small
+                    # batches, saving each as it completes. parse_details() runs
+                    # them under the spider's detail concurrency limit, so the
+                    # keyword slots together never open more than
+                    # max_concurrent detail pages.
+                    items = results[:10]
+                    for batch_num, start in enumerate(range(0, len(items), SAVE_BATCH_SIZE), 1):
+                        detailed_results = []
+                        for detail in await spider.parse_details(items[start:start + SAVE_BATCH_SIZE]):
+                            if isinstance(detail, Exception):
+                                logger.error(f"Error parsing detail for '{keyword}': {detail}")
+                            else:
+                                detailed_results.append(detail)
+                        
+                        if detailed_results:
+                            await spider.save_incremental_batch(
+                                detailed_results,
+                                keyword=keyword,
+                                batch_num=batch_num
+                            )
+                    
+                    # Random delay before this slot takes the next keyword
+                    await middleware.random_delay(2.0, 5.0)
                 
-            except Exception as e:
-                logger.error(f"Error processing keyword '{keyword}': {e}")
-                continue
-        
-        # Merge temp files for each keyword
-        logger.info("Merging temporary files...")
-        for keyword in keywords:
-            merged_file = await spider.merge_temp_files(keyword, 'domestic')
-            if merged_file:
-                logger.info(f"Merged file created: {merged_file}")
-        
-        # Cleanup
-        logger.info("Cleaning up...")
-        await browser.close()
+                except Exception as e:
+                    logger.error(f"Error processing keyword '{keyword}': {e}")
+            
+            await asyncio.gather(
+                *(process_keyword(idx, keyword) for idx, keyword in enumerate(keywords, 1))
+            )
+            
+            # Close the streamed workbook for each keyword
+            logger.info("Finalizing output files...")
+            for keyword in keywords:
+                merged_file = await spider.merge_temp_files(keyword, 'domestic')
+                if merged_file:
+                    logger.info(f"Merged file created: {merged_file}")
+            
+            logger.info("Cleaning up...")
         
         logger.info("Done!")
         
@@ -129,12 +173,6 @@ async def main():
         logger.info("Interrupted by user")
     except Exception as e:
         logger.error(f"Error: {e}", exc_info=True)
-    finally:
-        # Ensure cleanup
-        try:
-            await browser.close()
-        except:
-            pass
 
 
 if __name__ == '__main__':
@@ -1,13 +1,13 @@
 """Spider for scraping structured drug data by ingredient."""
 
 import asyncio
+import functools
+import json
 import logging
 import re
-import os
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
-import glob
 
 from playwright.async_api import Page
 import pandas as pd
@@ -15,25 +15,244 @@ import pandas as pd
 from core.base_spider import BaseSpider
 from core.browser import BrowserManager
 from core.middleware import AntiDetectionMiddleware
+from utils.excel import write_formatted_excel
 
 logger = logging.getLogger(__name__)
 
+# Cell formats shared by every workbook this spider writes
+_HEADER_FORMAT = {
+    'bold': True,
+    'text_wrap': True,
+    'valign': 'vcenter',
+    'align': 'center',
+    'fg_color': '#D3D3D3',
+    'border': 1
+}
+
+_CONTENT_FORMAT_WHITE = {
+    'text_wrap': True,
+    'valign': 'top',
+    'border': 1,
+    'fg_color': 'white'
+}
+
+_CONTENT_FORMAT_GRAY = {
+    'text_wrap': True,
+    'valign': 'top',
+    'border': 1,
+    'fg_color': '#F2F2F2'
+}
+
+_MAX_COLUMN_WIDTH = 70
+
+# Field mapping dictionary (handles variations): standard field name ->
+# accepted labels, per search type
+_DOMESTIC_FIELD_MAP = {
+    '药品名称': ('药品名称', '产品名称', '名称'),
+    '批准文号': ('批准文号', '批准号', '文号'),
+    '生产单位': ('生产单位', '生产企业', '企业名称'),
+    '产品类别': ('产品类别', '类别'),
+    '药品本位码': ('药品本位码', '本位码'),
+    '批准日期': ('批准日期', '批准时间'),
+    '药品类型': ('药品类型', '类型'),
+}
+
+_OVERSEAS_FIELD_MAP = {
+    **_DOMESTIC_FIELD_MAP,
+    '包装规格': ('包装规格', '规格'),
+    '剂型': ('剂型', '药品剂型'),
+    '生产地址': ('生产地址', '地址'),
+}
+
+# Characters that are unsafe in file names (plus whitespace)
+_SAFE_RE = re.compile(r'[\\/*?:"<>|\s]+')
+
+# Reads every search result row in one round-trip. Rows with fewer than
+# three cells are skipped; row_index is the row's position in the table.
+_EXTRACT_ROWS_JS = """() => {
+    const rows = [];
+    document.querySelectorAll('table tbody tr').forEach((tr, idx) => {
+        const cells = tr.querySelectorAll('td');
+        if (cells.length < 3) {
+            return;
+        }
+        rows.push({
+            sequence: (cells[0].textContent || '').trim(),
+            drug_name: (cells[1].textContent || '').trim(),
+            approval_number: (cells[2].textContent || '').trim(),
+            has_detail: tr.querySelector('button.detail-btn') !== null,
+            row_index: idx,
+        });
+    });
+    return rows;
+}"""
+
+# Reads every label/value pair of the detail table in one round-trip.
+# Trailing ASCII/full-width colons are stripped from labels here, so field
+# mapping only has to look up bare label names.
+_EXTRACT_DETAIL_FIELDS_JS = """() => {
+    const fields = {};
+    document.querySelectorAll('.detail-table tr').forEach((tr) => {
+        const label = tr.querySelector('td.label');
+        const value = tr.querySelector('td.value');
+        if (label && value && label.textContent && value.textContent) {
+            const key = label.textContent.trim().replace(/[:：]+$/, '').trim();
+            fields[key] = value.textContent.trim();
+        }
+    });
+    return fields;
+}"""
+
+
+@functools.lru_cache(maxsize=1024)
+def _safe_keyword(keyword: str) -> str:
+    """Turn a keyword into a file-name-safe fragment of at most 60 chars.
+    
+    Args:
+        keyword: Search keyword
+        
+    Returns:
+        Sanitized keyword
+    """
+    return _SAFE_RE.sub('_', keyword)[:60]
+
+
+def _build_field_index(field_mapping: Dict[str, Tuple[str, ...]]) -> Tuple[List[str], Dict[str, Tuple[str, int]]]:
+    """Build a reverse index from every accepted label to its standard field.
+    
+    Labels arrive with trailing colons already stripped (see
+    _EXTRACT_DETAIL_FIELDS_JS), so only bare variations are indexed. The
+    rank is the variation's position, so the earliest variation keeps
+    precedence when a page has several of them.
+    
+    Args:
+        field_mapping: Standard field name -> accepted label variations
+        
+    Returns:
+        Tuple of (standard field names, {label: (standard name, rank)})
+    """
+    index: Dict[str, Tuple[str, int]] = {}
+    for standard_name, variations in field_mapping.items():
+        for rank, variation in enumerate(variations):
+            index.setdefault(variation, (standard_name, rank))
+    return list(field_mapping), index
+
+
+def _add_formats(workbook: Any) -> Tuple[Any, Tuple[Any, Any]]:
+    """Register this spider's cell formats with a workbook.
+    
+    xlsxwriter formats belong to the workbook that created them, so this
+    runs once per workbook and the returned objects are reused for every
+    row written to it.
+    
+    Args:
+        workbook: xlsxwriter Workbook
+        
+    Returns:
+        Tuple of (header format, (even row format, odd row format))
+    """
+    header_format = workbook.add_format(_HEADER_FORMAT)
+    row_formats = (
+        workbook.add_format(_CONTENT_FORMAT_GRAY),
+        workbook.add_format(_CONTENT_FORMAT_WHITE),
+    )
+    return header_format, row_formats
+
+
+# Keys of the record parse_detail returns for a failed detail page, beyond
+# the validation columns every result has
+_ERROR_COLUMNS = ('drug_name', 'error')
+
+
+class _ExcelStream:
+    """Append-only formatted workbook backed by xlsxwriter's constant_memory mode.
+    
+    The header and cell formats are written/registered once when the stream
+    is opened; every append is a single write_row() per record, and each row
+    is flushed to disk as soon as the next one starts, so memory stays bounded
+    by the batch being written.
+    """
+
+    def __init__(self, filename: str, columns: List[str]):
+        """Open the workbook and write the header row.
+        
+        Args:
+            filename: Output .xlsx path
+            columns: Column names, in output order
+        """
+        import xlsxwriter
+        
+        self.filename = filename
+        self.columns = columns
+        self.rows = 0
+        # Column names plus unknown keys that were already reported
+        self._known_keys = set(columns)
+        self.widths = [len(str(col)) for col in columns]
+        
+        self.workbook = xlsxwriter.Workbook(filename, {'constant_memory': True})
+        self.worksheet = self.workbook.add_worksheet('Drug Data')
+        header_format, self.formats = _add_formats(self.workbook)
+        self.worksheet.write_row(0, 0, columns, header_format)
+
+    def append(self, records: List[Dict]) -> None:
+        """Write records below the rows already in the sheet.
+        
+        Args:
+            records: Result dictionaries; missing or NaN values become ''
+        """
+        widths = self.widths
+        for record in records:
+            if not self._known_keys.issuperset(record):
+                # The header is already on disk, so new columns can't be added
+                unknown = [key for key in record if key not in self._known_keys]
+                logger.warning(f"Dropping fields not in {self.filename} header: {', '.join(map(str, unknown))}")
+                self._known_keys.update(unknown)
+            
+            values = []
+            for col_num, col in enumerate(self.columns):
+                value = record.get(col)
+                if value is None or value != value:  # None or NaN
+                    value = ''
+                values.append(value)
+                widths[col_num] = max(widths[col_num], len(str(value)))
+            
+            self.worksheet.write_row(self.rows + 1, 0, values, self.formats[self.rows & 1])
+            self.rows += 1
+
+    def close(self) -> None:
+        """Apply column widths, freeze the header row and close the file."""
+        for i, width in enumerate(self.widths):
+            self.worksheet.set_column(i, i, min(width + 3, _MAX_COLUMN_WIDTH))
+        self.worksheet.freeze_panes(1, 0)
+        self.workbook.close()
+
 
 class IngredientSpider(BaseSpider):
     """Spider for scraping structured drug data by ingredient name.
     
     This spider searches for drugs by ingredient/component name,
     extracts structured table data, validates completeness,
-    and supports incremental saving with temp file merging.
+    and streams incremental batches into one workbook per keyword.
     
     Features:
     - Domestic and overseas drug search
     - Field mapping and validation
     - Incremental batch saving
-    - Temp file merging
+    - Append-only Excel output (constant memory)
+    - JSONL checkpoints for crash recovery
     - Data completeness checking
     """
 
+    # Built once at import and shared by every instance
+    _FIELD_MAPS = {
+        'domestic': _DOMESTIC_FIELD_MAP,
+        'overseas': _OVERSEAS_FIELD_MAP,
+    }
+    _FIELD_INDEXES = {
+        search_type: _build_field_index(mapping)
+        for search_type, mapping in _FIELD_MAPS.items()
+    }
+
     def __init__(
         self,
         browser_manager: BrowserManager,
@@ -55,6 +274,8 @@ class IngredientSpider(BaseSpider):
         self.search_url = spider_config.get('search_url', '')
         self.search_type = spider_config.get('search_type', 'domestic')  # domestic or overseas
         self.batch_size = spider_config.get('batch_size', 50)
+        # Continue keywords from their JSONL checkpoints instead of starting over
+        self.resume = spider_config.get('resume', False)
         
         # Output directories
         output_config = config.get('output', {})
@@ -65,6 +286,15 @@ class IngredientSpider(BaseSpider):
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.temp_dir.mkdir(parents=True, exist_ok=True)
         
+        # Date stamp shared by every file this run writes
+        self._run_date = datetime.now().strftime("%Y%m%d")
+        
+        # Open per-keyword workbooks fed by save_incremental_batch()
+        self._batch_streams: Dict[tuple, _ExcelStream] = {}
+        # One lock per keyword workbook; appends run in the executor and
+        # xlsxwriter worksheets aren't thread-safe
+        self._batch_locks: Dict[tuple, asyncio.Lock] = {}
+        
         # Field mappings
         self.domestic_fields = [
             '序号', '药品名称', '批准文号', '生产单位', '产品类别',
@@ -78,6 +308,7 @@ class IngredientSpider(BaseSpider):
         ]
         
         self.required_fields = ['药品名称', '批准文号', '生产单位']
+        self._validation_cache: Dict[tuple, Dict[str, str]] = {}
         
         logger.info(f"IngredientSpider initialized with search_type={self.search_type}")
 
@@ -104,28 +335,25 @@ class IngredientSpider(BaseSpider):
         all_results = []
         
         try:
-            page = await self.browser.get_page()
-            
-            # Navigate to search page
-            logger.info(f"Navigating to search page: {self.search_url}")
-            await page.goto(self.search_url, wait_until="networkidle", timeout=60000)
-            
-            # Select drug type (domestic/overseas)
-            await self._select_drug_type(page, search_type)
-            
-            # Input keyword and search
-            await self._input_keyword_and_search(page, keyword)
-            
-            # Wait for results
-            await self.middleware.wait_for_stable_dom(page, timeout=30000)
-            
-            # Extract table rows
-            results = await self._extract_table_rows(page, search_type)
-            all_results.extend(results)
-            
-            logger.info(f"Found {len(results)} results for keyword '{keyword}'")
-            
-            await page.close()
+            async with self.browser.acquire_page() as page:
+                # Navigate to search page
+                logger.info(f"Navigating to search page: {self.search_url}")
+                await page.goto(self.search_url, wait_until="networkidle", timeout=60000)
+                
+                # Select drug type (domestic/overseas)
+                await self._select_drug_type(page, search_type)
+                
+                # Input keyword and search
+                await self._input_keyword_and_search(page, keyword)
+                
+                # Wait for results
+                await self.middleware.wait_for_stable_dom(page, timeout=30000)
+                
+                # Extract table rows
+                results = await self._extract_table_rows(page, search_type)
+                all_results.extend(results)
+                
+                logger.info(f"Found {len(results)} results for keyword '{keyword}'")
             
         except Exception as e:
             logger.error(f"Error during search for '{keyword}': {e}", exc_info=True)
@@ -189,36 +417,12 @@ class IngredientSpider(BaseSpider):
             # Wait for table
             await page.wait_for_selector('table tbody tr', timeout=15000)
             
-            # Get all rows
-            rows = await page.query_selector_all('table tbody tr')
-            logger.info(f"Found {len(rows)} table rows")
-            
-            for idx, row in enumerate(rows):
-                try:
-                    # Extract basic info from row
-                    cells = await row.query_selector_all('td')
-                    
-                    if len(cells) >= 3:
-                        sequence = await cells[0].text_content()
-                        drug_name = await cells[1].text_content()
-                        approval_number = await cells[2].text_content()
-                        
-                        # Check if detail button exists
-                        detail_button = await row.query_selector('button.detail-btn')
-                        has_detail = detail_button is not None
-                        
-                        results.append({
-                            'sequence': sequence.strip() if sequence else '',
-                            'drug_name': drug_name.strip() if drug_name else '',
-                            'approval_number': approval_number.strip() if approval_number else '',
-                            'has_detail': has_detail,
-                            'row_index': idx,
-                            'search_type': search_type
-                        })
-                        
-                except Exception as row_e:
-                    logger.warning(f"Error extracting row {idx}: {row_e}")
-                    continue
+            # Extract all rows in a single evaluate() call
+            results = await page.evaluate(_EXTRACT_ROWS_JS)
+            logger.info(f"Found {len(results)} table rows")
+            
+            for row in results:
+                row['search_type'] = search_type
             
         except Exception as e:
             logger.error(f"Error extracting table rows: {e}")
@@ -243,14 +447,13 @@ class IngredientSpider(BaseSpider):
         logger.info(f"Parsing detail for: {drug_name}")
         
         try:
-            page = await self.browser.get_page()
-            
-            # Navigate back to search results if needed
-            # Then click detail button for this item
-            # This is simplified - actual implementation would need to maintain page state
-            
-            # Extract all fields
-            detail_data = await self._extract_detail_fields(page, search_type)
+            async with self.browser.acquire_page() as page:
+                # Navigate back to search results if needed
+                # Then click detail button for this item
+                # This is simplified - actual implementation would need to maintain page state
+                
+                # Extract all fields
+                detail_data = await self._extract_detail_fields(page, search_type)
             
             # Map fields to standard names
             mapped_data = self._map_fields(detail_data, search_type)
@@ -259,8 +462,6 @@ class IngredientSpider(BaseSpider):
             validation_result = self._validate_data(mapped_data)
             mapped_data.update(validation_result)
             
-            await page.close()
-            
             return mapped_data
             
         except Exception as e:
@@ -288,23 +489,8 @@ class IngredientSpider(BaseSpider):
             # Wait for detail content
             await page.wait_for_selector('.detail-content', timeout=10000)
             
-            # Extract fields from detail table
-            rows = await page.query_selector_all('.detail-table tr')
-            
-            for row in rows:
-                try:
-                    label_cell = await row.query_selector('td.label')
-                    value_cell = await row.query_selector('td.value')
-                    
-                    if label_cell and value_cell:
-                        label = await label_cell.text_content()
-                        value = await value_cell.text_content()
-                        
-                        if label and value:
-                            fields[label.strip()] = value.strip()
-                            
-                except Exception:
-                    continue
+            # Extract fields from detail table in a single evaluate() call
+            fields = await page.evaluate(_EXTRACT_DETAIL_FIELDS_JS)
             
         except Exception as e:
             logger.error(f"Error extracting detail fields: {e}")
@@ -321,39 +507,23 @@ class IngredientSpider(BaseSpider):
         Returns:
             Dictionary with mapped field names
         """
-        # Field mapping dictionary (handles variations)
-        field_mapping = {
-            '药品名称': ['药品名称', '产品名称', '名称'],
-            '批准文号': ['批准文号', '批准号', '文号'],
-            '生产单位': ['生产单位', '生产企业', '企业名称'],
-            '产品类别': ['产品类别', '类别'],
-            '药品本位码': ['药品本位码', '本位码'],
-            '批准日期': ['批准日期', '批准时间'],
-            '药品类型': ['药品类型', '类型'],
-        }
+        standard_names, field_index = self._FIELD_INDEXES[
+            'overseas' if search_type == 'overseas' else 'domestic'
+        ]
         
-        if search_type == 'overseas':
-            field_mapping.update({
-                '包装规格': ['包装规格', '规格'],
-                '剂型': ['剂型', '药品剂型'],
-                '生产地址': ['生产地址', '地址'],
-            })
-        
-        mapped_data = {}
-        
-        for standard_name, variations in field_mapping.items():
-            for variation in variations:
-                # Try with and without colon
-                for key in [variation, variation + ':', variation + '：']:
-                    if key in raw_data:
-                        mapped_data[standard_name] = raw_data[key]
-                        break
-                if standard_name in mapped_data:
-                    break
-            
-            # Set empty string if not found
-            if standard_name not in mapped_data:
-                mapped_data[standard_name] = ''
+        mapped_data = dict.fromkeys(standard_names, '')
+        best_rank: Dict[str, int] = {}
+        
+        # One lookup per extracted label; when several labels map to the
+        # same field, the earliest variation in the mapping wins
+        for key, value in raw_data.items():
+            match = field_index.get(key)
+            if match is None:
+                continue
+            standard_name, rank = match
+            if rank < best_rank.get(standard_name, rank + 1):
+                best_rank[standard_name] = rank
+                mapped_data[standard_name] = value
         
         return mapped_data
 
@@ -366,20 +536,23 @@ class IngredientSpider(BaseSpider):
         Returns:
             Dictionary with validation results
         """
-        missing_fields = []
-        
-        for field in self.required_fields:
-            if not data.get(field):
-                missing_fields.append(field)
-        
+        missing_fields = tuple(field for field in self.required_fields if not data.get(field))
         total_fields = len(self.required_fields)
-        present_fields = total_fields - len(missing_fields)
-        completeness = f"{(present_fields / total_fields * 100):.0f}%"
         
-        return {
-            'completeness': completeness,
-            'missing_fields': ', '.join(missing_fields) if missing_fields else 'None'
-        }
+        # Only a handful of missing-field combinations exist, so the
+        # formatted result is computed once per combination
+        key = (total_fields, missing_fields)
+        result = self._validation_cache.get(key)
+        if result is None:
+            present_fields = total_fields - len(missing_fields)
+            completeness = f"{(present_fields / total_fields * 100):.0f}%"
+            result = {
+                'completeness': completeness,
+                'missing_fields': ', '.join(missing_fields) if missing_fields else 'None'
+            }
+            self._validation_cache[key] = result
+        
+        return dict(result)
 
     async def save_results(self, data: List[Dict], output_path: str) -> None:
         """Save results to Excel file with formatting.
@@ -393,21 +566,13 @@ class IngredientSpider(BaseSpider):
                 logger.warning("No data to save")
                 return
             
-            # Create DataFrame
-            df = pd.DataFrame(data)
-            
             # Determine field order based on search type
             search_type = data[0].get('search_type', 'domestic')
-            field_order = self.domestic_fields if search_type == 'domestic' else self.overseas_fields
+            field_order = self._result_columns(search_type)
             
-            # Add validation columns
-            field_order = field_order + ['completeness', 'missing_fields']
-            
-            # Reorder columns
-            for col in field_order:
-                if col not in df.columns:
-                    df[col] = ''
-            df = df[field_order]
+            # Build the frame once, already in output order; missing
+            # columns come out empty instead of being inserted one by one
+            df = pd.DataFrame.from_records(data, columns=field_order)
             
             # Save with formatting
             await self._save_formatted_excel(df, output_path)
@@ -417,83 +582,191 @@ class IngredientSpider(BaseSpider):
         except Exception as e:
             logger.error(f"Error saving results: {e}", exc_info=True)
 
+    def _result_columns(self, search_type: str) -> List[str]:
+        """Get the output column order for a search type.
+        
+        Args:
+            search_type: 'domestic' or 'overseas'
+            
+        Returns:
+            Field names followed by the validation columns
+        """
+        field_order = self.domestic_fields if search_type == 'domestic' else self.overseas_fields
+        return field_order + ['completeness', 'missing_fields']
+
+    async def open_results(self, output_path: str) -> None:
+        """Reset the streaming results writer used by run().
+        
+        The workbook itself is created on the first append_results() call,
+        so runs without results don't leave an empty file behind.
+        
+        Args:
+            output_path: Path to output Excel file
+        """
+        self._results_stream: Optional[_ExcelStream] = None
+        # Keywords run concurrently, and appends run in the executor
+        self._results_lock = asyncio.Lock()
+
+    async def append_results(self, data: List[Dict], output_path: str) -> None:
+        """Stream a batch of results straight into the output workbook.
+        
+        Args:
+            data: List of result dictionaries
+            output_path: Path to output Excel file
+        """
+        loop = asyncio.get_running_loop()
+        async with self._results_lock:
+            if self._results_stream is None:
+                # Column order follows the search type of the first result
+                search_type = data[0].get('search_type', 'domestic')
+                self._results_stream = await loop.run_in_executor(
+                    None, _ExcelStream, output_path, self._result_columns(search_type)
+                )
+            
+            await loop.run_in_executor(None, self._results_stream.append, data)
+
+    async def close_results(self, output_path: str) -> None:
+        """Finalize column widths and close the streamed workbook.
+        
+        Args:
+            output_path: Path to output Excel file
+        """
+        stream, self._results_stream = self._results_stream, None
+        if stream is None:
+            return
+        
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, stream.close)
+        logger.info(f"Results saved to {output_path} ({stream.rows} rows)")
+
     async def _save_formatted_excel(self, df: pd.DataFrame, filename: str) -> None:
         """Save DataFrame to formatted Excel file.
         
+        The workbook is rendered in the default executor so pages keep
+        loading while a large frame is written.
+        
         Args:
             df: DataFrame to save
             filename: Output filename
         """
         try:
-            with pd.ExcelWriter(filename, engine='xlsxwriter') as writer:
-                df.to_excel(writer, sheet_name='Drug Data', index=False, header=False, startrow=1)
-                
-                workbook = writer.book
-                worksheet = writer.sheets['Drug Data']
-                
-                # Define formats
-                header_format = workbook.add_format({
-                    'bold': True,
-                    'text_wrap': True,
-                    'valign': 'vcenter',
-                    'align': 'center',
-                    'fg_color': '#D3D3D3',
-                    'border': 1
-                })
-                
-                content_format_white = workbook.add_format({
-                    'text_wrap': True,
-                    'valign': 'top',
-                    'border': 1,
-                    'fg_color': 'white'
-                })
-                
-                content_format_gray = workbook.add_format({
-                    'text_wrap': True,
-                    'valign': 'top',
-                    'border': 1,
-                    'fg_color': '#F2F2F2'
-                })
-                
-                # Write headers
-                for col_num, value in enumerate(df.columns.values):
-                    worksheet.write(0, col_num, value, header_format)
-                
-                # Write data with alternating colors
-                for row_num in range(len(df)):
-                    row_format = content_format_gray if row_num % 2 == 0 else content_format_white
-                    for col_num in range(len(df.columns)):
-                        value = df.iloc[row_num, col_num]
-                        if pd.isna(value) or value is None:
-                            worksheet.write(row_num + 1, col_num, "", row_format)
-                        else:
-                            worksheet.write(row_num + 1, col_num, value, row_format)
-                
-                # Auto-adjust column widths
-                for i, col in enumerate(df.columns):
-                    header_width = len(str(col))
-                    content_width = df[col].astype(str).map(len).max()
-                    if pd.isna(content_width):
-                        content_width = 0
-                    column_width = max(header_width, int(content_width)) + 3
-                    column_width = min(column_width, 70)  # Max width
-                    worksheet.set_column(i, i, column_width)
-                
-                # Freeze first row
-                worksheet.freeze_panes(1, 0)
-            
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._write_formatted_excel, df, filename)
             logger.info(f"Formatted Excel saved: {filename}")
             
         except Exception as e:
             logger.error(f"Error saving formatted Excel: {e}", exc_info=True)
 
+    @staticmethod
+    def _write_formatted_excel(df: pd.DataFrame, filename: str) -> None:
+        """Write DataFrame to a formatted Excel file (blocking).
+        
+        Args:
+            df: DataFrame to save
+            filename: Output filename
+        """
+        write_formatted_excel(
+            df,
+            filename,
+            'Drug Data',
+            _HEADER_FORMAT,
+            (_CONTENT_FORMAT_GRAY, _CONTENT_FORMAT_WHITE),
+            max_column_width=_MAX_COLUMN_WIDTH,
+            freeze_header=True
+        )
+
+    def _checkpoint_path(self, search_type: str, safe_keyword: str) -> Path:
+        """Get the JSONL checkpoint file for a keyword's batches.
+        
+        Args:
+            search_type: 'domestic' or 'overseas'
+            safe_keyword: Sanitized keyword
+            
+        Returns:
+            Path in temp_dir
+        """
+        return self.temp_dir / f"{search_type}_{safe_keyword}.jsonl"
+
+    @staticmethod
+    def _write_jsonl(path: Path, records: List[Dict], mode: str = 'a') -> None:
+        """Write records to a JSONL file, one JSON object per line (blocking).
+        
+        Args:
+            path: JSONL file
+            records: Records to write
+            mode: 'a' to append, 'w' to replace the file
+        """
+        lines = ''.join(json.dumps(record, ensure_ascii=False, default=str) + '\n' for record in records)
+        with open(path, mode, encoding='utf-8') as f:
+            f.write(lines)
+
+    @staticmethod
+    def _read_jsonl(path: Path) -> List[Dict]:
+        """Read the records of a JSONL file, if it exists (blocking).
+        
+        A truncated last line, left by a crash mid-write, is skipped.
+        
+        Args:
+            path: JSONL file
+            
+        Returns:
+            List of records, empty if the file doesn't exist
+        """
+        records = []
+        try:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        logger.warning(f"Skipping unreadable line in {path}")
+        except FileNotFoundError:
+            pass
+        return records
+
+    def _open_batch_stream(self, search_type: str, safe_keyword: str, records: List[Dict]) -> _ExcelStream:
+        """Open the streamed workbook for a keyword and register it.
+        
+        Args:
+            search_type: 'domestic' or 'overseas'
+            safe_keyword: Sanitized keyword
+            records: First records to be written; keys outside the result
+                schema are added after it
+            
+        Returns:
+            The new stream
+        """
+        filename = self.data_dir / f"{search_type}_{safe_keyword}_{self._run_date}_merged.xlsx"
+        # The header can't grow once rows are streamed, so start from every
+        # column a result can have, including those of parse_detail's
+        # error records, rather than from whatever the first batch holds
+        columns = self._result_columns(search_type)
+        columns += [
+            col for col in dict.fromkeys(
+                [*_ERROR_COLUMNS, *(col for record in records for col in record)]
+            )
+            if col not in columns
+        ]
+        stream = _ExcelStream(str(filename), columns)
+        self._batch_streams[(search_type, safe_keyword)] = stream
+        return stream
+
     async def save_incremental_batch(
         self,
         batch_data: List[Dict],
         keyword: str,
         batch_num: int
     ) -> None:
-        """Save a batch of results to temporary file.
+        """Append a batch of results to the keyword's output workbook.
+        
+        The first batch for a (search_type, keyword) pair opens a streamed
+        workbook in data_dir; later batches are appended to it, and
+        merge_temp_files() closes it. Each batch is also appended to a JSONL
+        checkpoint in temp_dir, since the workbook is unreadable until
+        closed. With ``resume: true`` in the spider config, rows
+        checkpointed by an interrupted run are replayed into the workbook
+        when the keyword is picked up again; otherwise a leftover checkpoint
+        is discarded, as the keyword is being scraped from the start.
         
         Args:
             batch_data: Batch of result dictionaries
@@ -505,85 +778,97 @@ class IngredientSpider(BaseSpider):
             return
         
         try:
-            # Generate safe filename
-            safe_keyword = re.sub(r'[\\/*?:"<>|\s]+', '_', keyword)
-            safe_keyword = safe_keyword[:60]  # Limit length
+            safe_keyword = _safe_keyword(keyword)
             
-            timestamp = datetime.now().strftime("%Y%m%d")
             search_type = batch_data[0].get('search_type', 'domestic')
-            
-            temp_filename = self.temp_dir / f"{search_type}_{safe_keyword}_{timestamp}_batch{batch_num}.xlsx"
-            
-            logger.info(f"Saving incremental batch to: {temp_filename}")
-            
-            df = pd.DataFrame(batch_data)
-            await self._save_formatted_excel(df, str(temp_filename))
+            checkpoint = self._checkpoint_path(search_type, safe_keyword)
+            loop = asyncio.get_running_loop()
+            
+            key = (search_type, safe_keyword)
+            # Held from the lookup on, so concurrent first batches can't each
+            # open a workbook and replay the checkpoint
+            async with self._batch_locks.setdefault(key, asyncio.Lock()):
+                stream = self._batch_streams.get(key)
+                if stream is None:
+                    recovered = []
+                    if self.resume:
+                        recovered = await loop.run_in_executor(None, self._read_jsonl, checkpoint)
+                    stream = self._open_batch_stream(search_type, safe_keyword, recovered + batch_data)
+                    if recovered:
+                        logger.info(f"Resuming {len(recovered)} checkpointed rows for '{keyword}'")
+                        await loop.run_in_executor(None, stream.append, recovered)
+                    # Rewritten rather than appended to, so a line truncated by
+                    # an interrupted run can't swallow the next record
+                    await loop.run_in_executor(None, self._write_jsonl, checkpoint, recovered + batch_data, 'w')
+                else:
+                    await loop.run_in_executor(None, self._write_jsonl, checkpoint, batch_data)
+                
+                logger.info(f"Appending batch {batch_num} ({len(batch_data)} rows) to: {stream.filename}")
+                await loop.run_in_executor(None, stream.append, batch_data)
             
         except Exception as e:
             logger.error(f"Error saving incremental batch: {e}", exc_info=True)
 
     async def merge_temp_files(self, keyword: str, search_type: str) -> Optional[str]:
-        """Merge temporary files for a keyword into final file.
+        """Finish the streamed workbook for a keyword.
+        
+        Batches are already written to their final file as they arrive, so
+        this normally only closes that workbook. If there is no open
+        workbook (e.g. the process was restarted), it is rebuilt from the
+        keyword's JSONL checkpoint. The checkpoint is removed once the
+        workbook is saved.
         
         Args:
             keyword: Search keyword
             search_type: 'domestic' or 'overseas'
             
         Returns:
-            Path to merged file, or None if no files found
+            Path to merged file, or None if no batches were saved
         """
         try:
-            # Generate safe keyword
-            safe_keyword = re.sub(r'[\\/*?:"<>|\s]+', '_', keyword)
-            safe_keyword = safe_keyword[:60]
-            
-            timestamp = datetime.now().strftime("%Y%m%d")
-            
-            # Find temp files
-            pattern = str(self.temp_dir / f"{search_type}_{safe_keyword}_{timestamp}_*.xlsx")
-            temp_files = glob.glob(pattern)
-            
-            if not temp_files:
-                logger.warning(f"No temp files found for keyword '{keyword}'")
-                return None
-            
-            logger.info(f"Found {len(temp_files)} temp files to merge for '{keyword}'")
-            
-            # Read and concatenate
-            dfs = []
-            for temp_file in temp_files:
-                try:
-                    df = pd.read_excel(temp_file)
-                    dfs.append(df)
-                except Exception as e:
-                    logger.error(f"Error reading temp file {temp_file}: {e}")
-            
-            if not dfs:
-                logger.warning("No data frames to merge")
-                return None
-            
-            # Concatenate
-            merged_df = pd.concat(dfs, ignore_index=True)
+            safe_keyword = _safe_keyword(keyword)
+            checkpoint = self._checkpoint_path(search_type, safe_keyword)
+            loop = asyncio.get_running_loop()
+            
+            # Wait for batches still being written
+            async with self._batch_locks.pop((search_type, safe_keyword), asyncio.Lock()):
+                stream = self._batch_streams.pop((search_type, safe_keyword), None)
+            if stream is None:
+                recovered = await loop.run_in_executor(None, self._read_jsonl, checkpoint)
+                if not recovered:
+                    logger.warning(f"No saved batches found for keyword '{keyword}'")
+                    return None
+                
+                logger.info(f"Rebuilding '{keyword}' from {len(recovered)} checkpointed rows")
+                stream = self._open_batch_stream(search_type, safe_keyword, recovered)
+                self._batch_streams.pop((search_type, safe_keyword))
+                await loop.run_in_executor(None, stream.append, recovered)
             
-            # Save merged file
-            final_filename = self.data_dir / f"{search_type}_{safe_keyword}_{timestamp}_merged.xlsx"
-            await self._save_formatted_excel(merged_df, str(final_filename))
+            await loop.run_in_executor(None, stream.close)
+            logger.info(f"Saved {stream.rows} rows for '{keyword}' to: {stream.filename}")
             
-            # Delete temp files
-            for temp_file in temp_files:
-                try:
-                    os.remove(temp_file)
-                    logger.debug(f"Deleted temp file: {temp_file}")
-                except Exception as e:
-                    logger.warning(f"Could not delete temp file {temp_file}: {e}")
+            try:
+                checkpoint.unlink()
+            except FileNotFoundError:
+                pass
             
-            logger.info(f"Merged {len(temp_files)} files into: {final_filename}")
-            return str(final_filename)
+            return stream.filename
             
         except Exception as e:
             logger.error(f"Error merging temp files: {e}", exc_info=True)
             return None
 
+    async def cleanup(self) -> None:
+        """Close any batch workbooks that were never merged."""
+        streams = list(self._batch_streams.values())
+        self._batch_streams.clear()
+        self._batch_locks.clear()
+        for stream in streams:
+            try:
+                stream.close()
+            except Exception as e:
+                logger.warning(f"Could not close {stream.filename}: {e}")
+
     async def _search_mock(self, keyword: str) -> List[Dict]:
         """Mock search for test mode.
         
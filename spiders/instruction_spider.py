@@ -1,23 +1,107 @@
 """Spider for scraping pharmaceutical instruction PDFs."""
 
 import asyncio
+import json
 import logging
+import os
 import re
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional
 from urllib.parse import urljoin
 from datetime import datetime
 
-from playwright.async_api import Page, Download
-from bs4 import BeautifulSoup
-import pandas as pd
+from playwright.async_api import APIRequestContext, BrowserContext, Page, Download
 
 from core.base_spider import BaseSpider
 from core.browser import BrowserManager
 from core.middleware import AntiDetectionMiddleware
+from utils.excel import write_formatted_excel
 
 logger = logging.getLogger(__name__)
 
+# Regexes are compiled once at import rather than looked up in re's cache
+# on every call; new patterns in this package should follow suit
+_TOTAL_COUNT_RE = re.compile(r'共\s+(\d+)\s+条')
+
+# Characters removed from drug names to build PDF file names; a plain
+# character strip, so str.translate does it without a regex
+_UNSAFE_FILENAME_TABLE = str.maketrans('', '', '\\/*?:"<>|')
+
+# Cell formats of the failed-downloads workbook
+_HEADER_FORMAT = {
+    'bold': True,
+    'text_wrap': True,
+    'valign': 'vcenter',
+    'align': 'center',
+    'fg_color': '#808080',
+    'font_color': 'white',
+    'border': 1
+}
+
+_CONTENT_FORMAT_WHITE = {
+    'text_wrap': True,
+    'valign': 'top',
+    'border': 1,
+    'fg_color': 'white'
+}
+
+_CONTENT_FORMAT_GRAY = {
+    'text_wrap': True,
+    'valign': 'top',
+    'border': 1,
+    'fg_color': '#F0F0F0'
+}
+
+# Finds the detail page's "说明书" row and returns its second cell's text
+# and the "下载附件" link href, or null until the row shows either "暂无"
+# or that link (polled by wait_for_function)
+_INSTRUCTION_ROW_JS = """() => {
+    for (const tr of document.querySelectorAll('tr')) {
+        const cells = Array.from(tr.querySelectorAll('td'));
+        if (!cells.some((td) => (td.textContent || '').trim() === '说明书')) {
+            continue;
+        }
+        const cell = tr.querySelector('td:nth-child(2)');
+        const text = cell ? (cell.textContent || '') : '';
+        const link = Array.from(tr.querySelectorAll('a')).find(
+            (a) => (a.textContent || '').trim() === '下载附件'
+        );
+        if (text.includes('暂无') || link) {
+            return {text: text, href: link ? link.getAttribute('href') : null};
+        }
+    }
+    return null;
+}"""
+
+# True once the list's first row shows the given sequence number (polled by
+# wait_for_function, so the check runs in the page rather than per CDP call)
+_FIRST_ROW_SEQ_JS = """(seq) => {
+    const cell = document.querySelector('table tbody tr:first-child td[data-field="0"]');
+    return !!cell && (cell.textContent || '').trim() === seq;
+}"""
+
+# Reads every list row in one round-trip. Rows without a linked drug name
+# are skipped; hrefs are returned as written and resolved in Python.
+_EXTRACT_DRUG_LINKS_JS = """() => {
+    const text = (el, fallback) => (el && el.textContent !== null) ? el.textContent.trim() : fallback;
+    const rows = [];
+    document.querySelectorAll('table tbody tr').forEach((tr) => {
+        const link = tr.querySelector('td[data-field="ypmc"] a');
+        const href = link ? link.getAttribute('href') : null;
+        if (!href) {
+            return;
+        }
+        rows.push({
+            sequence: text(tr.querySelector('td[data-field="0"]'), 'UNKNOWN_SEQ'),
+            approval_number: text(tr.querySelector('td[data-field="pzwh"]'), 'UNKNOWN_APPROVAL'),
+            name: text(link, ''),
+            href: href,
+        });
+    });
+    return rows;
+}"""
+
 
 class InstructionSpider(BaseSpider):
     """Spider for scraping pharmaceutical instruction PDFs.
@@ -32,6 +116,29 @@ class InstructionSpider(BaseSpider):
     - Test mode support for offline testing
     """
 
+    # Slots instead of a per-instance __dict__: attribute access skips the
+    # dict lookup and instances are smaller. The trade-off is that nothing
+    # outside this list can be set on an instance, so tests and callers
+    # can't monkeypatch instance attributes (including methods); patch the
+    # class with patch.object(InstructionSpider, ...) instead. New
+    # attributes must be added here.
+    __slots__ = (
+        'base_url',
+        'list_page_url',
+        'items_per_page',
+        'concurrency',
+        'context_pool_size',
+        'save_dir',
+        '_existing_files',
+        '_download_locks',
+        '_result_counts',
+        '_failures_path',
+        'ocr_engine',
+        '_total_pages',
+        '_contexts',
+        '_context_idx',
+    )
+
     def __init__(
         self,
         browser_manager: BrowserManager,
@@ -52,16 +159,92 @@ class InstructionSpider(BaseSpider):
         self.base_url = spider_config.get('base_url', 'https://www.cde.org.cn')
         self.list_page_url = spider_config.get('list_page_url', '')
         self.items_per_page = spider_config.get('items_per_page', 10)
+        # Detail pages (PDF downloads) opened at once by parse_details()/run()
+        self.concurrency = int(spider_config.get('concurrency', self._get_concurrency_limit()))
+        # Browser contexts the downloads are spread across; 1 keeps them all
+        # in the browser manager's shared context
+        self.context_pool_size = int(spider_config.get('context_pool_size', 1))
         self.save_dir = Path(config.get('output', {}).get('pdf_dir', 'output/pdfs'))
         
         # Create output directory
         self.save_dir.mkdir(parents=True, exist_ok=True)
         
+        # Names of PDFs already on disk, read with one directory listing so
+        # resumed runs skip them without a stat() per item
+        self._existing_files = set(os.listdir(self.save_dir))
+        
+        # One lock per target file. Keywords run concurrently but crawl the
+        # same list, so the same PDF can come up in several at once.
+        self._download_locks: Dict[str, asyncio.Lock] = {}
+        
+        # Results sink state, set by open_results(): [total, successful]
+        # counts, and the JSONL file failed downloads are streamed to
+        self._result_counts = [0, 0]
+        self._failures_path: Optional[Path] = None
+        
         # OCR engine (lazy initialization)
         self.ocr_engine = None
         
+        # Page count of the list, read once per crawl by _get_total_pages()
+        self._total_pages: Optional[int] = None
+        
+        # Isolated download contexts, opened on first use by _detail_page()
+        self._contexts: Optional[asyncio.Future] = None
+        self._context_idx = 0
+        
         logger.info(f"InstructionSpider initialized with base_url={self.base_url}")
 
+    def _get_detail_concurrency_limit(self) -> int:
+        """Get the number of detail pages downloaded concurrently."""
+        return self.concurrency
+
+    async def _open_download_contexts(self) -> List[BrowserContext]:
+        """Open the isolated contexts detail pages are spread across.
+        
+        Returns:
+            The new contexts, or an empty list if the browser manager can't
+            create them (e.g. it runs a persistent context)
+        """
+        try:
+            contexts = await asyncio.gather(
+                *(self.browser.new_context() for _ in range(self.context_pool_size))
+            )
+        except RuntimeError as e:
+            logger.warning(f"Downloading through the shared browser context: {e}")
+            return []
+        
+        logger.info(f"Opened {len(contexts)} browser contexts for downloads")
+        return list(contexts)
+
+    @asynccontextmanager
+    async def _detail_page(self) -> AsyncIterator[Page]:
+        """Borrow a page for one detail page visit.
+        
+        With context_pool_size > 1 the pages are handed out round-robin from
+        a pool of isolated contexts, each with its own User-Agent, cookies
+        and connections; otherwise they come from the shared context.
+        
+        Yields:
+            Page instance
+        """
+        if self.context_pool_size > 1 and self._contexts is None:
+            # Every concurrent caller awaits the same opening
+            self._contexts = asyncio.ensure_future(self._open_download_contexts())
+        contexts = await self._contexts if self._contexts is not None else []
+        
+        if not contexts:
+            async with self.browser.acquire_page() as page:
+                yield page
+            return
+        
+        context = contexts[self._context_idx % len(contexts)]
+        self._context_idx += 1
+        page = await context.new_page()
+        try:
+            yield page
+        finally:
+            await page.close()
+
     async def search(
         self,
         keyword: str,
@@ -84,66 +267,107 @@ class InstructionSpider(BaseSpider):
             - name: Drug name
             - url: Detail page URL
         """
+        all_results = []
+        async for page_results in self.iter_search(keyword, start_page, end_page, **kwargs):
+            all_results.extend(page_results)
+        return all_results
+
+    async def iter_search(
+        self,
+        keyword: str,
+        start_page: int = 1,
+        end_page: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[List[Dict]]:
+        """Yield search results one list page at a time.
+        
+        run() starts downloading a page's PDFs as soon as it is yielded, so
+        the delay before the next list page is spent downloading.
+        
+        Args:
+            keyword: Search keyword (not used in list-based scraping)
+            start_page: Starting page number
+            end_page: Ending page number (None = all pages)
+            **kwargs: Additional parameters
+            
+        Yields:
+            Items from each list page, shaped as described in search()
+        """
         if self.test_mode:
-            return await self._search_mock(keyword, start_page, end_page)
+            yield await self._search_mock(keyword, start_page, end_page)
+            return
         
-        all_results = []
+        # Detail URLs already yielded; sorting drift between list pages can
+        # repeat rows, which would otherwise be visited (and downloaded) twice
+        seen_urls = set()
         
         try:
             # Get page for searching
-            page = await self.browser.get_page()
-            
-            # Navigate to list page
-            logger.info(f"Navigating to list page: {self.list_page_url}")
-            await page.goto(self.list_page_url, wait_until="networkidle", timeout=60000)
-            
-            # Get total pages
-            total_pages = await self._get_total_pages(page)
-            if end_page is None or end_page > total_pages:
-                end_page = total_pages
-            
-            logger.info(f"Total pages: {total_pages}, scraping pages {start_page} to {end_page}")
-            
-            # Scrape each page
-            for page_num in range(start_page, end_page + 1):
-                logger.info(f"Processing page {page_num}/{end_page}")
-                
-                # Navigate to page
-                if page_num > start_page:
-                    success = await self._navigate_to_page(page, page_num)
-                    if not success:
-                        logger.error(f"Failed to navigate to page {page_num}, skipping")
-                        continue
+            async with self.browser.acquire_page() as page:
+                # Navigate to list page
+                logger.info(f"Navigating to list page: {self.list_page_url}")
+                # _get_total_pages() waits for the pager, which gates readiness
+                await page.goto(self.list_page_url, wait_until="domcontentloaded", timeout=30000)
                 
-                # Wait for table to update
-                await self._wait_for_table_update(page, page_num)
+                # Get total pages
+                total_pages = await self._get_total_pages(page)
+                if end_page is None or end_page > total_pages:
+                    end_page = total_pages
                 
-                # Extract drug links from current page
-                page_results = await self._extract_drug_links(page)
-                all_results.extend(page_results)
+                logger.info(f"Total pages: {total_pages}, scraping pages {start_page} to {end_page}")
                 
-                logger.info(f"Extracted {len(page_results)} items from page {page_num}")
-                
-                # Random delay between pages
-                if page_num < end_page:
-                    await self.middleware.random_delay(2.0, 5.0)
-            
-            await page.close()
+                # Scrape each page
+                for page_num in range(start_page, end_page + 1):
+                    logger.info(f"Processing page {page_num}/{end_page}")
+                    
+                    # Navigate to page
+                    if page_num > start_page:
+                        success = await self._navigate_to_page(page, page_num)
+                        if not success:
+                            logger.error(f"Failed to navigate to page {page_num}, skipping")
+                            continue
+                    
+                    # Wait for table to update
+                    await self._wait_for_table_update(page, page_num)
+                    
+                    # Extract drug links from current page
+                    page_results = await self._extract_drug_links(page)
+                    new_results = []
+                    for item in page_results:
+                        if item['url'] not in seen_urls:
+                            seen_urls.add(item['url'])
+                            new_results.append(item)
+                    
+                    logger.info(f"Extracted {len(page_results)} items from page {page_num}")
+                    skipped = len(page_results) - len(new_results)
+                    if skipped:
+                        logger.info(f"Skipped {skipped} items already listed on an earlier page")
+                    if new_results:
+                        yield new_results
+                    
+                    # Random delay between pages
+                    if page_num < end_page:
+                        await self.middleware.random_delay(2.0, 5.0)
             
         except Exception as e:
             logger.error(f"Error during search: {e}", exc_info=True)
-        
-        return all_results
 
     async def _get_total_pages(self, page: Page) -> int:
         """Get total number of pages.
         
+        The count is cached after the first successful read, so repeated
+        searches don't wait on the pager again. The fallback used when it
+        can't be read is not cached.
+        
         Args:
             page: Playwright Page object
             
         Returns:
             Total number of pages
         """
+        if self._total_pages is not None:
+            return self._total_pages
+        
         try:
             # Wait for pagination info
             pagination_info = await page.wait_for_selector(
@@ -154,7 +378,7 @@ class InstructionSpider(BaseSpider):
             if pagination_info:
                 text = await pagination_info.text_content()
                 # Extract total count
-                match = re.search(r'共\s+(\d+)\s+条', text)
+                match = _TOTAL_COUNT_RE.search(text)
                 if match:
                     total_count = int(match.group(1))
                     
@@ -172,6 +396,7 @@ class InstructionSpider(BaseSpider):
                     
                     total_pages = (total_count + self.items_per_page - 1) // self.items_per_page
                     logger.info(f"Total: {total_count} items, {self.items_per_page} per page, {total_pages} pages")
+                    self._total_pages = total_pages
                     return total_pages
             
             logger.warning("Could not get total pages, using default")
@@ -203,10 +428,8 @@ class InstructionSpider(BaseSpider):
                 await page.locator(page_input_selector).fill(str(page_num))
                 await page.locator(jump_button_selector).click()
                 
-                # Wait for page load
-                await page.wait_for_load_state("networkidle", timeout=30000)
-                
-                # Verify page number updated
+                # Verify page number updated; this also waits for the
+                # pager to re-render, so no separate load-state wait
                 try:
                     await page.locator('.layui-laypage-curr em').filter(has_text=str(page_num)).wait_for(timeout=15000)
                     logger.info(f"Successfully navigated to page {page_num}")
@@ -239,8 +462,7 @@ class InstructionSpider(BaseSpider):
             target_first_seq = str((page_num - 1) * self.items_per_page + 1)
             logger.info(f"Waiting for table to update, target first sequence: {target_first_seq}")
             
-            first_row_seq_locator = page.locator('table tbody tr:first-child td[data-field="0"]')
-            await first_row_seq_locator.filter(has_text=target_first_seq).wait_for(timeout=20000)
+            await page.wait_for_function(_FIRST_ROW_SEQ_JS, arg=target_first_seq, timeout=20000)
             
             logger.info(f"Table content synced for page {page_num}")
             
@@ -263,37 +485,17 @@ class InstructionSpider(BaseSpider):
             # Wait for table rows
             await page.wait_for_selector("table tbody tr", timeout=15000)
             
-            # Get all rows
-            rows = await page.query_selector_all("table tbody tr")
-            logger.debug(f"Found {len(rows)} rows")
+            # Read all rows in a single evaluate() call
+            rows = await page.evaluate(_EXTRACT_DRUG_LINKS_JS)
+            logger.debug(f"Found {len(rows)} linked rows")
             
             for row in rows:
-                try:
-                    # Get sequence number (first column)
-                    sequence_elem = await row.query_selector('td[data-field="0"]')
-                    sequence = await sequence_elem.text_content() if sequence_elem else "UNKNOWN_SEQ"
-                    
-                    # Get approval number (second column)
-                    approval_elem = await row.query_selector('td[data-field="pzwh"]')
-                    approval_number = await approval_elem.text_content() if approval_elem else "UNKNOWN_APPROVAL"
-                    
-                    # Get name and link (third column)
-                    name_cell = await row.query_selector('td[data-field="ypmc"] a')
-                    if name_cell:
-                        drug_name = await name_cell.text_content()
-                        drug_url = await name_cell.get_attribute("href")
-                        if drug_url:
-                            full_url = urljoin(self.base_url, drug_url)
-                            drug_details.append({
-                                "sequence": sequence.strip(),
-                                "approval_number": approval_number.strip(),
-                                "name": drug_name.strip(),
-                                "url": full_url
-                            })
-                            
-                except Exception as row_e:
-                    logger.warning(f"Error processing row: {row_e}")
-                    continue
+                drug_details.append({
+                    "sequence": row['sequence'],
+                    "approval_number": row['approval_number'],
+                    "name": row['name'],
+                    "url": urljoin(self.base_url, row['href'])
+                })
             
             return drug_details
             
@@ -321,30 +523,36 @@ class InstructionSpider(BaseSpider):
         logger.info(f"Processing: seq={sequence}, approval={approval_number}, name={drug_name}")
         
         # Generate filename
-        safe_name = re.sub(r'[\\/*?:"<>|]', "", drug_name)
+        safe_name = drug_name.translate(_UNSAFE_FILENAME_TABLE)
         target_filename = f"{sequence}_{approval_number}_{safe_name}.pdf"
         download_path = self.save_dir / target_filename
         
-        # Skip if file exists
-        if download_path.exists():
-            logger.info(f"File already exists, skipping: {target_filename}")
-            return {
-                "status": "skipped",
-                "sequence": sequence,
-                "approval_number": approval_number,
-                "name": drug_name,
-                "path": str(download_path),
-                "message": "File already exists"
-            }
-        
-        # Download PDF
-        result = await self._download_pdf_from_detail(
-            detail_url,
-            download_path,
-            sequence,
-            approval_number,
-            drug_name
-        )
+        # Held until the download finishes, so a duplicate waits for it and
+        # then finds the file instead of fetching it again
+        async with self._download_locks.setdefault(target_filename, asyncio.Lock()):
+            # Skip if file exists
+            if target_filename in self._existing_files:
+                logger.info(f"File already exists, skipping: {target_filename}")
+                return {
+                    "status": "skipped",
+                    "sequence": sequence,
+                    "approval_number": approval_number,
+                    "name": drug_name,
+                    "path": str(download_path),
+                    "message": "File already exists"
+                }
+            
+            # Download PDF
+            result = await self._download_pdf_from_detail(
+                detail_url,
+                download_path,
+                sequence,
+                approval_number,
+                drug_name
+            )
+            
+            if result.get("status") == "success":
+                self._existing_files.add(target_filename)
         
         result.update({
             "sequence": sequence,
@@ -374,70 +582,223 @@ class InstructionSpider(BaseSpider):
         Returns:
             Dictionary with download result
         """
-        detail_page = None
-        
         try:
-            # Open detail page in new tab
-            detail_page = await self.browser.context.new_page()
-            await detail_page.goto(detail_url, wait_until="networkidle", timeout=60000)
-            logger.info(f"Detail page loaded: {detail_url}")
-            
-            # Check for "暂无" (no PDF available)
-            sms_cell_selector = 'tr:has(td:text-is("说明书")) td:nth-child(2)'
-            try:
-                sms_content_element = detail_page.locator(sms_cell_selector)
-                await sms_content_element.wait_for(state="visible", timeout=5000)
-                actual_text = await sms_content_element.text_content()
+            async with self._detail_page() as detail_page:
+                # The wait below covers the part of the page we need; networkidle
+                # would stall while sibling tabs keep the network busy
+                await detail_page.goto(detail_url, wait_until="domcontentloaded", timeout=30000)
+                logger.info(f"Detail page loaded: {detail_url}")
+                
+                # Read the "说明书" row in one in-page poll: it resolves once the
+                # row shows either "暂无" or the download link
+                try:
+                    handle = await detail_page.wait_for_function(_INSTRUCTION_ROW_JS, timeout=10000)
+                    instruction_row = await handle.json_value()
+                except Exception as e:
+                    logger.warning(f"Could not find or download PDF: {e}")
+                    return {
+                        "status": "no_pdf",
+                        "message": f"Download link not found or download failed: {e}"
+                    }
                 
-                if "暂无" in actual_text:
+                if "暂无" in instruction_row['text']:
                     logger.warning(f"No PDF available for {drug_name}")
                     return {
                         "status": "no_pdf",
                         "message": "Page shows '暂无' (no PDF available)"
                     }
-            except Exception:
-                logger.debug("Could not check for '暂无', continuing to look for download link")
-            
-            # Find download link
-            try:
-                attachment_link_locator = detail_page.locator(
-                    'tr:has(td:text-is("说明书")) a:text-is("下载附件")'
-                )
-                await attachment_link_locator.wait_for(state="visible", timeout=10000)
-                logger.info("Found '下载附件' link")
-                
-                # Download PDF
-                async with detail_page.expect_download(timeout=60000) as download_info:
-                    await attachment_link_locator.click()
-                    logger.info("Clicked download link, waiting for download...")
-                
-                download = await download_info.value
-                await download.save_as(str(download_path))
-                logger.info(f"Successfully downloaded: {download_path.name}")
-                
-                return {
-                    "status": "success",
-                    "path": str(download_path),
-                    "message": "Download successful"
-                }
-                
-            except Exception as download_e:
-                logger.warning(f"Could not find or download PDF: {download_e}")
-                return {
-                    "status": "no_pdf",
-                    "message": f"Download link not found or download failed: {download_e}"
-                }
                 
+                # Download the PDF
+                try:
+                    logger.info("Found '下载附件' link")
+                    attachment_link_locator = detail_page.locator(
+                        'tr:has(td:text-is("说明书")) a:text-is("下载附件")'
+                    )
+                    
+                    # Fetch the file directly when the link is a real URL;
+                    # otherwise let the page trigger the download
+                    request = detail_page.context.request
+                    if not await self._fetch_attachment(request, detail_url, instruction_row['href'], download_path):
+                        async with detail_page.expect_download(timeout=60000) as download_info:
+                            await attachment_link_locator.click()
+                            logger.info("Clicked download link, waiting for download...")
+                        
+                        download = await download_info.value
+                        await self._save_download(download, download_path)
+                    logger.info(f"Successfully downloaded: {download_path.name}")
+                    
+                    return {
+                        "status": "success",
+                        "path": str(download_path),
+                        "message": "Download successful"
+                    }
+                    
+                except Exception as download_e:
+                    logger.warning(f"Could not find or download PDF: {download_e}")
+                    return {
+                        "status": "no_pdf",
+                        "message": f"Download link not found or download failed: {download_e}"
+                    }
+                    
         except Exception as e:
             logger.error(f"Error processing detail page {detail_url}: {e}", exc_info=True)
             return {
                 "status": "error",
                 "message": f"Detail page error: {e}"
             }
+
+    async def _fetch_attachment(
+        self,
+        request: APIRequestContext,
+        detail_url: str,
+        href: Optional[str],
+        download_path: Path
+    ) -> bool:
+        """Download an attachment with the browser context's HTTP client.
+        
+        context.request shares cookies with the browser pages, so the
+        request carries the same session without rendering anything or
+        going through the browser's download machinery.
+        
+        Args:
+            request: HTTP client of the context the detail page was opened in
+            detail_url: URL of the detail page, used to resolve relative links
+            href: href of the download link
+            download_path: Path to save the file
             
+        Returns:
+            True if the file was saved, False if the caller should fall back
+            to clicking the link (no usable href, HTTP error, HTML response)
+        """
+        if not href or href.startswith(('javascript:', '#')):
+            return False
+        
+        url = urljoin(detail_url, href)
+        try:
+            response = await request.get(url, timeout=60000)
+        except Exception as e:
+            logger.warning(f"Direct download failed for {url}: {e}")
+            return False
+        
+        try:
+            content_type = response.headers.get('content-type', '')
+            if not response.ok or content_type.startswith('text/html'):
+                logger.debug(f"Direct download of {url} returned {response.status} {content_type}")
+                return False
+            body = await response.body()
         finally:
-            if detail_page:
-                await detail_page.close()
+            await response.dispose()
+        
+        # PDFs can be large; write in the default executor so other
+        # downloads keep progressing during disk writeback
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, download_path.write_bytes, body)
+        return True
+
+    @staticmethod
+    async def _save_download(download: Download, download_path: Path) -> None:
+        """Move a finished browser download to its target path.
+        
+        The browser has already written the file to its own download
+        directory, so it is renamed into place instead of copied with
+        save_as(). save_as() is still used when the file isn't available
+        locally (e.g. a remote browser) or lives on another filesystem.
+        
+        Args:
+            download: Playwright Download object
+            download_path: Path to save the file
+        """
+        try:
+            source = await download.path()
+            if source is not None:
+                os.replace(source, download_path)
+                return
+        except Exception as e:
+            logger.debug(f"Could not move download into place, copying instead: {e}")
+        
+        await download.save_as(str(download_path))
+
+    async def open_results(self, output_path: str) -> None:
+        """Start streaming results for a run.
+        
+        Successful downloads are already on disk as PDFs, so only their
+        count is kept. Failures are appended to a JSONL file next to
+        output_path as each keyword finishes, so memory doesn't grow with
+        the run and a crashed run still leaves its failure list behind.
+        
+        Args:
+            output_path: Path to output file
+        """
+        self._result_counts = [0, 0]
+        self._failures_path = Path(output_path).with_suffix('.failed.jsonl')
+        self._failures_path.parent.mkdir(parents=True, exist_ok=True)
+        self._failures_path.write_text('', encoding='utf-8')
+
+    async def append_results(self, data: List[Dict], output_path: str) -> None:
+        """Count a keyword's results and stream its failures to disk.
+        
+        Args:
+            data: List of result dictionaries
+            output_path: Path to output file
+        """
+        failed = [d for d in data if d.get('status') != 'success']
+        self._result_counts[0] += len(data)
+        self._result_counts[1] += len(data) - len(failed)
+        
+        if failed:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._append_jsonl, self._failures_path, failed)
+
+    async def close_results(self, output_path: str) -> None:
+        """Export the streamed failures to Excel and log the run totals.
+        
+        The JSONL file is removed once the workbook is written.
+        
+        Args:
+            output_path: Path to output file
+        """
+        path, self._failures_path = self._failures_path, None
+        if path is None:
+            return
+        
+        total, successful = self._result_counts
+        loop = asyncio.get_running_loop()
+        failed = await loop.run_in_executor(None, self._read_jsonl, path)
+        
+        if failed:
+            if not await self._save_failed_downloads(failed, output_path):
+                logger.warning(f"Failed downloads kept in {path}")
+                return
+        path.unlink(missing_ok=True)
+        
+        logger.info(f"Total: {total}, Success: {successful}, Failed: {total - successful}")
+
+    @staticmethod
+    def _append_jsonl(path: Path, records: List[Dict]) -> None:
+        """Append records to a JSONL file, one JSON object per line (blocking).
+        
+        Args:
+            path: JSONL file
+            records: Records to append
+        """
+        lines = ''.join(json.dumps(record, ensure_ascii=False, default=str) + '\n' for record in records)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+    @staticmethod
+    def _read_jsonl(path: Path) -> List[Dict]:
+        """Read the records of a JSONL file (blocking).
+        
+        Args:
+            path: JSONL file
+            
+        Returns:
+            List of records, empty if the file doesn't exist
+        """
+        if not path.exists():
+            return []
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
 
     async def save_results(self, data: List[Dict], output_path: str) -> None:
         """Save results to Excel file.
@@ -464,80 +825,52 @@ class InstructionSpider(BaseSpider):
         except Exception as e:
             logger.error(f"Error saving results: {e}", exc_info=True)
 
-    async def _save_failed_downloads(self, failures: List[Dict], base_path: str) -> None:
+    async def _save_failed_downloads(self, failures: List[Dict], base_path: str) -> bool:
         """Save failed downloads to formatted Excel file.
         
+        The workbook is built in the default executor so downloads still in
+        flight aren't held up.
+        
         Args:
             failures: List of failed download dictionaries
             base_path: Base path for output file
+            
+        Returns:
+            True if the workbook was written
         """
         try:
-            # Create DataFrame
-            df = pd.DataFrame(failures)
-            
             # Generate filename
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             excel_path = Path(base_path).parent / f"failed_downloads_{timestamp}.xlsx"
             
-            # Write with formatting
-            with pd.ExcelWriter(excel_path, engine='xlsxwriter') as writer:
-                df.to_excel(writer, sheet_name='Failed Downloads', index=False, header=False, startrow=1)
-                
-                workbook = writer.book
-                worksheet = writer.sheets['Failed Downloads']
-                
-                # Define formats
-                header_format = workbook.add_format({
-                    'bold': True,
-                    'text_wrap': True,
-                    'valign': 'vcenter',
-                    'align': 'center',
-                    'fg_color': '#808080',
-                    'font_color': 'white',
-                    'border': 1
-                })
-                
-                content_format_white = workbook.add_format({
-                    'text_wrap': True,
-                    'valign': 'top',
-                    'border': 1,
-                    'fg_color': 'white'
-                })
-                
-                content_format_gray = workbook.add_format({
-                    'text_wrap': True,
-                    'valign': 'top',
-                    'border': 1,
-                    'fg_color': '#F0F0F0'
-                })
-                
-                # Write headers
-                for col_num, value in enumerate(df.columns.values):
-                    worksheet.write(0, col_num, value, header_format)
-                
-                # Write data with alternating colors
-                for row_num in range(len(df)):
-                    row_format = content_format_gray if row_num % 2 == 0 else content_format_white
-                    for col_num in range(len(df.columns)):
-                        value = df.iloc[row_num, col_num]
-                        if pd.isna(value) or value is None:
-                            worksheet.write(row_num + 1, col_num, "", row_format)
-                        else:
-                            worksheet.write(row_num + 1, col_num, value, row_format)
-                
-                # Auto-adjust column widths
-                for i, col in enumerate(df.columns):
-                    header_width = len(str(col))
-                    content_width = df[col].astype(str).map(len).max()
-                    if pd.isna(content_width):
-                        content_width = 0
-                    column_width = max(header_width, int(content_width)) + 3
-                    worksheet.set_column(i, i, column_width)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._write_failed_downloads, failures, str(excel_path))
             
             logger.info(f"Failed downloads saved to: {excel_path}")
+            return True
             
         except Exception as e:
             logger.error(f"Error saving failed downloads: {e}", exc_info=True)
+            return False
+
+    @staticmethod
+    def _write_failed_downloads(failures: List[Dict], filename: str) -> None:
+        """Write failed downloads to a formatted Excel file (blocking).
+        
+        Args:
+            failures: List of failed download dictionaries
+            filename: Output filename
+        """
+        # Only needed for this end-of-run export, so kept out of module import
+        import pandas as pd
+        
+        write_formatted_excel(
+            pd.DataFrame(failures),
+            filename,
+            'Failed Downloads',
+            _HEADER_FORMAT,
+            (_CONTENT_FORMAT_GRAY, _CONTENT_FORMAT_WHITE)
+        )
 
     async def _search_mock(
         self,
@@ -0,0 +1,82 @@
+"""Shared fixtures for the test suite."""
+
+import pytest
+import pytest_asyncio
+
+pytest.importorskip("playwright")
+
+from core.browser import BrowserManager
+
+try:
+    import uvloop
+except ImportError:  # optional; not available on Windows
+    uvloop = None
+
+
+if uvloop is not None:
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_asyncio_loop_factories(config, item):
+        """Run async tests on uvloop (older pytest-asyncio releases ignore this hook)."""
+        return {'uvloop': uvloop.new_event_loop}
+
+
+_SHARED_BROWSER_CONFIG = {
+    'browser': {
+        'headless': True,
+        'user_agents_file': None,
+        'stealth_script': None,
+    }
+}
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def shared_browser():
+    """Launch one browser for every test that only needs a running manager.
+
+    Starting Chromium dominates the cost of these tests, so it happens once
+    per session instead of once per test.
+    """
+    BrowserManager.reset_instance()
+    manager = await BrowserManager.get_instance(_SHARED_BROWSER_CONFIG)
+    BrowserManager.reset_instance()
+    yield manager
+    await manager.close()
+
+
+@pytest.fixture(autouse=True)
+def reset_browser_singleton():
+    """Start and end every test without a BrowserManager singleton.
+
+    Only the class-level reference is dropped; tests that launch their own
+    browser close it themselves, and the shared browser is closed at the
+    end of the session.
+    """
+    BrowserManager._instance = None
+    yield
+    BrowserManager._instance = None
+
+
+@pytest_asyncio.fixture
+async def close_browser_singleton():
+    """Close the singleton a test launched, even if the test failed first.
+
+    Opted into with ``pytestmark = pytest.mark.usefixtures(...)`` by tests
+    that launch their own browser rather than using the shared one.
+    """
+    yield
+    instance = BrowserManager._instance
+    if instance is not None and instance._initialized:
+        await instance.close()
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def browser_manager(shared_browser):
+    """Make the shared browser the BrowserManager singleton for one test.
+
+    Its context is replaced afterwards, so cookies and pages don't leak
+    into the next test while the browser process itself stays up.
+    """
+    BrowserManager._instance = shared_browser
+    yield shared_browser
+    if shared_browser._initialized:
+        await shared_browser.reset_context()
@@ -1,8 +1,11 @@
 """Tests for BaseSpider abstract class."""
 
 import pytest
+import asyncio
+import time
 from pathlib import Path
 from typing import Dict, List
+from unittest.mock import AsyncMock
 
 from core.base_spider import BaseSpider
 from core.browser import BrowserManager
@@ -28,6 +31,8 @@ class ConcreteSpider(BaseSpider):
     async def parse_detail(self, item: Dict) -> Dict:
         """Mock parse_detail implementation."""
         self.parse_detail_called = True
+        if item.get('_latency'):
+            await asyncio.sleep(item['_latency'])
         return {'item_id': item.get('id'), 'data': 'test_data'}
     
     async def save_results(self, data: List[Dict], output_path: str) -> None:
@@ -61,12 +66,9 @@ class TestBaseSpider:
         }
     
     @pytest.fixture
-    async def browser_manager(self, config):
-        """Create browser manager instance."""
-        manager = await BrowserManager.get_instance(config)
-        yield manager
-        await manager.close()
-        BrowserManager.reset_instance()
+    def browser_manager(self):
+        """Create a mock browser manager; ConcreteSpider never drives a page."""
+        return AsyncMock(spec=BrowserManager)
     
     @pytest.fixture
     def middleware(self, config):
@@ -108,7 +110,6 @@ class TestBaseSpider:
         spider2 = ConcreteSpider(browser_manager, middleware, config_without_test_mode)
         assert spider2.test_mode is False
     
-    @pytest.mark.asyncio
     async def test_run_orchestration(self, concrete_spider, tmp_path):
         """Test run() method orchestrates search -> parse -> save flow."""
         # Set up mock data
@@ -135,7 +136,6 @@ class TestBaseSpider:
         assert len(concrete_spider.detail_results) == 2
         assert all('keyword' in result for result in concrete_spider.detail_results)
     
-    @pytest.mark.asyncio
     async def test_run_with_multiple_keywords(self, concrete_spider, tmp_path):
         """Test run() with multiple keywords."""
         concrete_spider.search_results = [{'id': 1}]
@@ -147,7 +147,27 @@ class TestBaseSpider:
         assert stats['total_items'] == 3  # 1 item per keyword
         assert stats['successful'] == 3
     
-    @pytest.mark.asyncio
+    async def test_run_parses_details_concurrently(self, concrete_spider, tmp_path):
+        """Test run() overlaps parse_detail calls instead of awaiting them in turn."""
+        latency = 0.05
+        concrete_spider.search_results = [{'id': i, '_latency': latency} for i in range(10)]
+        
+        start = time.perf_counter()
+        stats = await concrete_spider.run(['test_keyword'], output_dir=str(tmp_path))
+        elapsed = time.perf_counter() - start
+        
+        assert stats['successful'] == 10
+        # max_concurrent=3 needs 4 rounds of sleeps; serial would need 10
+        assert elapsed < 10 * latency * 0.8
+    
+    def test_run_again_under_new_event_loop(self, concrete_spider, tmp_path):
+        """Test run() doesn't reuse semaphores bound to a previous event loop."""
+        concrete_spider.search_results = [{'id': i, '_latency': 0.01} for i in range(6)]
+        
+        for _ in range(2):
+            stats = asyncio.run(concrete_spider.run(['k1', 'k2', 'k3', 'k4'], output_dir=str(tmp_path)))
+            assert stats['successful'] == 24
+    
     async def test_run_handles_search_errors(self, concrete_spider, tmp_path):
         """Test run() handles errors during search."""
         # Make search raise an exception
@@ -164,7 +184,6 @@ class TestBaseSpider:
         assert len(stats['errors']) > 0
         assert 'Search failed' in str(stats['errors'][0])
     
-    @pytest.mark.asyncio
     async def test_run_handles_parse_errors(self, concrete_spider, tmp_path):
         """Test run() handles errors during detail parsing."""
         concrete_spider.search_results = [{'id': 1}, {'id': 2}]
@@ -183,7 +202,71 @@ class TestBaseSpider:
         assert stats['failed'] == 2
         assert len(stats['errors']) == 2
     
-    @pytest.mark.asyncio
+    async def test_parse_details_bounded_and_ordered(self, concrete_spider):
+        """Test parse_details() respects max_concurrent and keeps item order."""
+        active = 0
+        peak = 0
+        
+        async def tracked_parse(item: Dict):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            if item['id'] == 2:
+                raise ValueError("Parse failed")
+            return {'item_id': item['id']}
+        
+        concrete_spider.parse_detail = tracked_parse
+        results = await concrete_spider.parse_details([{'id': i} for i in range(6)])
+        
+        assert peak == 3
+        assert isinstance(results[2], ValueError)
+        assert [r['item_id'] for i, r in enumerate(results) if i != 2] == [0, 1, 3, 4, 5]
+    
+    async def test_detail_concurrency_limit_override(self, concrete_spider):
+        """Test subclasses can bound parse_detail separately from keywords."""
+        active = 0
+        peak = 0
+        
+        async def tracked_parse(item: Dict):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return item
+        
+        concrete_spider.parse_detail = tracked_parse
+        concrete_spider._get_detail_concurrency_limit = lambda: 2
+        await concrete_spider.parse_details([{'id': i} for i in range(6)])
+        
+        assert peak == 2
+    
+    async def test_run_parses_batches_while_search_continues(self, concrete_spider, tmp_path):
+        """Test run() starts on a batch's details before later batches arrive."""
+        first_batch_parsed = asyncio.Event()
+        
+        async def paged_search(keyword: str, **kwargs):
+            yield [{'id': 1}]
+            # Only reachable if the first item was parsed before this batch
+            await asyncio.wait_for(first_batch_parsed.wait(), timeout=1)
+            yield [{'id': 2}]
+        
+        async def tracked_parse(item: Dict):
+            if item['id'] == 1:
+                first_batch_parsed.set()
+            return {'item_id': item['id']}
+        
+        concrete_spider.iter_search = paged_search
+        concrete_spider.parse_detail = tracked_parse
+        stats = await concrete_spider.run(['keyword'], output_dir=str(tmp_path))
+        
+        assert stats['total_items'] == 2
+        assert stats['successful'] == 2
+        assert stats['errors'] == []
+        assert [r['item_id'] for r in concrete_spider.detail_results] == [1, 2]
+    
     async def test_run_creates_output_directory(self, concrete_spider, tmp_path):
         """Test run() creates output directory if it doesn't exist."""
         output_dir = tmp_path / "new_output_dir"
@@ -195,7 +278,6 @@ class TestBaseSpider:
         assert output_dir.exists()
         assert output_dir.is_dir()
     
-    @pytest.mark.asyncio
     async def test_run_with_no_results(self, concrete_spider, tmp_path):
         """Test run() handles case with no search results."""
         concrete_spider.search_results = []
@@ -208,7 +290,6 @@ class TestBaseSpider:
         assert stats['failed'] == 0
         assert not concrete_spider.save_results_called
     
-    @pytest.mark.asyncio
     async def test_run_continues_after_partial_failure(self, concrete_spider, tmp_path):
         """Test run() continues processing after some items fail."""
         concrete_spider.search_results = [
@@ -243,13 +324,11 @@ class TestBaseSpider:
         assert path.name == filename
         assert "tests/mock_data" in str(path)
     
-    @pytest.mark.asyncio
     async def test_cleanup(self, concrete_spider):
         """Test cleanup() method can be called."""
         # Should not raise any exceptions
         await concrete_spider.cleanup()
     
-    @pytest.mark.asyncio
     async def test_run_adds_keyword_to_results(self, concrete_spider, tmp_path):
         """Test run() adds keyword field to each result."""
         concrete_spider.search_results = [{'id': 1}]
@@ -1,22 +1,56 @@
 """Tests for configuration management."""
 
+import copy
 import pytest
-import os
-import tempfile
-from pathlib import Path
-import sys
+import yaml
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import load_config, validate_config, validate_config_fast
 
-from config import load_config, validate_config
+
+_MINIMAL_YAML = """
+browser:
+  headless: {headless}
+anti_detection:
+  max_concurrent: 3
+output:
+  directory: "output"
+logging:
+  level: "INFO"
+"""
+
+# Smallest config validate_config accepts; tests deep-copy it before mutating
+_BASE_CONFIG = {
+    'browser': {'headless': True},
+    'anti_detection': {'max_concurrent': 3},
+    'output': {'directory': 'output'},
+    'logging': {'level': 'INFO'},
+}
+
+
+def _dump_with_max_concurrent(value: str) -> str:
+    """Serialize _BASE_CONFIG with anti_detection.max_concurrent replaced."""
+    config = copy.deepcopy(_BASE_CONFIG)
+    config['anti_detection']['max_concurrent'] = value
+    return yaml.safe_dump(config)
+
+
+# Config files for the env-var tests, serialized once at import
+_ENV_VAR_YAML = _dump_with_max_concurrent('${TEST_MAX_CONCURRENT}')
+_ENV_VAR_DEFAULT_YAML = _dump_with_max_concurrent('${NONEXISTENT_VAR:3}')
+
+
+@pytest.fixture(scope="module")
+def default_config():
+    """Load the default config.yaml once for the tests that only read it."""
+    return load_config()
 
 
 class TestConfigLoading:
     """Tests for configuration loading."""
 
-    def test_load_default_config(self):
+    def test_load_default_config(self, default_config):
         """Test loading default config.yaml."""
-        config = load_config()
+        config = default_config
         
         assert config is not None
         assert 'browser' in config
@@ -24,11 +58,10 @@ class TestConfigLoading:
         assert 'output' in config
         assert 'logging' in config
 
-    def test_load_custom_config(self):
+    def test_load_custom_config(self, tmp_path):
         """Test loading custom config file."""
-        # Create temporary config
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            f.write("""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("""
 browser:
   headless: true
 anti_detection:
@@ -38,65 +71,68 @@ output:
 logging:
   level: "DEBUG"
 """)
-            temp_path = f.name
         
-        try:
-            config = load_config(temp_path)
-            assert config['browser']['headless'] is True
-            assert config['anti_detection']['max_concurrent'] == 5
-        finally:
-            os.unlink(temp_path)
+        config = load_config(str(config_file))
+        assert config['browser']['headless'] is True
+        assert config['anti_detection']['max_concurrent'] == 5
 
     def test_load_nonexistent_config(self):
         """Test that loading nonexistent config raises error."""
         with pytest.raises(FileNotFoundError):
             load_config('/nonexistent/config.yaml')
 
-    def test_environment_variable_substitution(self):
+    def test_environment_variable_substitution(self, tmp_path, monkeypatch):
         """Test that environment variables are substituted."""
-        # Set test environment variable
-        os.environ['TEST_MAX_CONCURRENT'] = '10'
+        monkeypatch.setenv('TEST_MAX_CONCURRENT', '10')
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            f.write("""
-browser:
-  headless: true
-anti_detection:
-  max_concurrent: ${TEST_MAX_CONCURRENT}
-output:
-  directory: "output"
-logging:
-  level: "INFO"
-""")
-            temp_path = f.name
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(_ENV_VAR_YAML)
         
-        try:
-            config = load_config(temp_path)
-            assert config['anti_detection']['max_concurrent'] == '10'
-        finally:
-            os.unlink(temp_path)
-            del os.environ['TEST_MAX_CONCURRENT']
+        config = load_config(str(config_file))
+        assert config['anti_detection']['max_concurrent'] == '10'
 
-    def test_environment_variable_with_default(self):
+    def test_environment_variable_with_default(self, tmp_path, monkeypatch):
         """Test environment variable with default value."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            f.write("""
-browser:
-  headless: true
-anti_detection:
-  max_concurrent: ${NONEXISTENT_VAR:3}
-output:
-  directory: "output"
-logging:
-  level: "INFO"
-""")
-            temp_path = f.name
+        monkeypatch.delenv('NONEXISTENT_VAR', raising=False)
         
-        try:
-            config = load_config(temp_path)
-            assert config['anti_detection']['max_concurrent'] == '3'
-        finally:
-            os.unlink(temp_path)
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(_ENV_VAR_DEFAULT_YAML)
+        
+        config = load_config(str(config_file))
+        assert config['anti_detection']['max_concurrent'] == '3'
+
+    @pytest.mark.parametrize("strict", [False, True])
+    @pytest.mark.parametrize("value, expected", [
+        ('true', True),
+        ('False', False),
+    ])
+    def test_headless_string_loaded_as_bool(self, tmp_path, monkeypatch, strict, value, expected):
+        """Test that a substituted "true"/"false" headless is loaded as a bool."""
+        monkeypatch.setenv('HEADLESS', value)
+        
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(_MINIMAL_YAML.format(headless='${HEADLESS}'))
+        
+        assert load_config(str(config_file), strict=strict)['browser']['headless'] is expected
+
+    def test_cached_config_is_not_shared(self):
+        """Test that mutating a loaded config doesn't affect later loads."""
+        config = load_config()
+        config['browser']['headless'] = 'mutated'
+
+        reloaded = load_config()
+        assert reloaded['browser']['headless'] != 'mutated'
+
+    def test_config_reloaded_after_file_change(self, tmp_path):
+        """Test that the cache is invalidated when the file changes."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(_MINIMAL_YAML.format(headless='true'))
+
+        assert load_config(str(config_file))['browser']['headless'] is True
+
+        config_file.write_text(_MINIMAL_YAML.format(headless='false') + "  # changed\n")
+
+        assert load_config(str(config_file))['browser']['headless'] is False
 
 
 class TestConfigValidation:
@@ -104,57 +140,90 @@ class TestConfigValidation:
 
     def test_validate_complete_config(self):
         """Test validation of complete config."""
-        config = {
-            'browser': {'headless': True},
-            'anti_detection': {'max_concurrent': 3},
-            'output': {'directory': 'output'},
-            'logging': {'level': 'INFO'}
-        }
-        
-        assert validate_config(config) is True
+        assert validate_config(copy.deepcopy(_BASE_CONFIG)) is True
 
-    def test_validate_missing_section(self):
-        """Test validation fails with missing section."""
-        config = {
-            'browser': {'headless': True},
-            'anti_detection': {'max_concurrent': 3},
-            # Missing 'output' and 'logging'
-        }
+    @pytest.mark.parametrize("mutate, message", [
+        (lambda c: c.pop('output'), "Missing required config section: output"),
+        (lambda c: c['browser'].pop('headless'), "Missing required browser.headless setting"),
+        (lambda c: c['anti_detection'].pop('max_concurrent'),
+         "Missing required anti_detection.max_concurrent setting"),
+        (lambda c: c['browser'].update(headless='yes'),
+         "Invalid browser.headless setting: must be true or false"),
+        (lambda c: c['anti_detection'].update(max_concurrent='many'),
+         "Invalid anti_detection.max_concurrent setting: must be a positive integer"),
+    ], ids=[
+        'missing_section',
+        'missing_browser_headless',
+        'missing_max_concurrent',
+        'invalid_headless_type',
+        'invalid_max_concurrent_type',
+    ])
+    def test_validate_rejects_bad_config(self, mutate, message):
+        """Test validation fails on missing or mistyped settings."""
+        config = copy.deepcopy(_BASE_CONFIG)
+        mutate(config)
         
-        with pytest.raises(ValueError, match="Missing required config section"):
+        with pytest.raises(ValueError) as exc_info:
             validate_config(config)
+        assert str(exc_info.value) == message
 
-    def test_validate_missing_browser_headless(self):
-        """Test validation fails with missing browser.headless."""
-        config = {
-            'browser': {},  # Missing 'headless'
-            'anti_detection': {'max_concurrent': 3},
-            'output': {'directory': 'output'},
-            'logging': {'level': 'INFO'}
-        }
-        
-        with pytest.raises(ValueError, match="Missing required browser.headless"):
+    def test_validate_sees_changes_after_success(self):
+        """Test that a config changed after validating is checked again."""
+        config = copy.deepcopy(_BASE_CONFIG)
+        assert validate_config(config) is True
+
+        del config['browser']['headless']
+        with pytest.raises(ValueError, match="Missing required browser.headless setting"):
             validate_config(config)
 
-    def test_validate_missing_max_concurrent(self):
-        """Test validation fails with missing max_concurrent."""
-        config = {
-            'browser': {'headless': True},
-            'anti_detection': {},  # Missing 'max_concurrent'
-            'output': {'directory': 'output'},
-            'logging': {'level': 'INFO'}
-        }
+    def test_validate_accepts_headless_string(self):
+        """Test that an env-substituted "false" headless passes unchanged."""
+        config = copy.deepcopy(_BASE_CONFIG)
+        config['browser']['headless'] = 'false'
         
-        with pytest.raises(ValueError, match="Missing required anti_detection.max_concurrent"):
-            validate_config(config)
+        assert validate_config(config) is True
+        assert config['browser']['headless'] == 'false'
+
+    def test_validate_fast(self):
+        """Test fast validation accepts complete configs and rejects incomplete ones."""
+        config = copy.deepcopy(_BASE_CONFIG)
+        assert validate_config_fast(config) is True
+
+        del config['browser']['headless']
+        with pytest.raises(ValueError, match="Missing required config settings"):
+            validate_config_fast(config)
+
+    def test_load_config_validates(self, tmp_path):
+        """Test that load_config rejects configs missing required settings."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("browser:\n  headless: true\n")
+
+        with pytest.raises(ValueError, match="Missing required config settings"):
+            load_config(str(config_file))
+
+        with pytest.raises(ValueError) as exc_info:
+            load_config(str(config_file), strict=True)
+        assert str(exc_info.value) == "Missing required config section: anti_detection"
+
+    def test_load_empty_config_fails_validation(self, tmp_path):
+        """Test that an empty config file gives a validation error, not a crash."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("")
+
+        with pytest.raises(ValueError, match="Missing required config settings"):
+            load_config(str(config_file))
+
+        with pytest.raises(ValueError) as exc_info:
+            load_config(str(config_file), strict=True)
+        assert str(exc_info.value) == "Missing required config section: browser"
 
 
 class TestConfigStructure:
     """Tests for config structure and content."""
 
-    def test_default_config_has_browser_settings(self):
+    def test_default_config_has_browser_settings(self, default_config):
         """Test that default config has all browser settings."""
-        config = load_config()
+        config = default_config
         browser = config['browser']
         
         assert 'headless' in browser
@@ -162,24 +231,24 @@ class TestConfigStructure:
         assert 'locale' in browser
         assert 'timezone' in browser
 
-    def test_default_config_has_anti_detection_settings(self):
+    def test_default_config_has_anti_detection_settings(self, default_config):
         """Test that default config has anti-detection settings."""
-        config = load_config()
+        config = default_config
         anti_detection = config['anti_detection']
         
         assert 'max_concurrent' in anti_detection
         assert 'request_delay' in anti_detection
         assert 'retry' in anti_detection
 
-    def test_default_config_has_spider_settings(self):
+    def test_default_config_has_spider_settings(self, default_config):
         """Test that default config has spider settings."""
-        config = load_config()
+        config = default_config
         
         assert 'spiders' in config
         assert 'instruction' in config['spiders']
         assert 'ingredient' in config['spiders']
 
-    def test_config_urls_are_externalized(self):
+    def test_config_urls_are_externalized(self, default_config):
         """Property 7: Configuration Externalization.
         
         For any target URL or sensitive configuration, it should be loaded
@@ -188,7 +257,7 @@ class TestConfigStructure:
         Feature: playwright-async-crawler-suite, Property 7: Configuration Externalization
         Validates: Requirements 9.3, 11.3
         """
-        config = load_config()
+        config = default_config
         
         # Check that URLs are in config
         assert 'target_url' in config['spiders']['instruction']
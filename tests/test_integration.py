@@ -0,0 +1,47 @@
+"""End-to-end smoke tests against a real Chromium instance."""
+
+import pytest
+
+from spiders import InstructionSpider
+
+pytestmark = pytest.mark.integration
+
+
+_LIST_PAGE_HTML = """
+<table><tbody>
+  <tr>
+    <td data-field="0">1</td>
+    <td data-field="pzwh">国药准字H00000001</td>
+    <td data-field="ypmc"><a href="/detail/1">阿司匹林肠溶片</a></td>
+  </tr>
+  <tr>
+    <td data-field="0">2</td>
+    <td data-field="pzwh">国药准字H00000002</td>
+    <td data-field="ypmc">布洛芬缓释胶囊</td>
+  </tr>
+</tbody></table>
+"""
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_extract_drug_links_in_real_browser(browser_manager, tmp_path):
+    """Test list rows are read from a real page through the shared browser."""
+    if not browser_manager._initialized:
+        pytest.skip("Chromium is not available")
+    
+    config = {
+        'spiders': {'instruction': {'base_url': 'https://example.com'}},
+        'output': {'pdf_dir': str(tmp_path)},
+    }
+    spider = InstructionSpider(browser_manager, None, config)
+    
+    async with browser_manager.acquire_page() as page:
+        await page.set_content(_LIST_PAGE_HTML)
+        links = await spider._extract_drug_links(page)
+    
+    assert links == [{
+        'sequence': '1',
+        'approval_number': '国药准字H00000001',
+        'name': '阿司匹林肠溶片',
+        'url': 'https://example.com/detail/1',
+    }]
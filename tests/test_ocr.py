@@ -0,0 +1,46 @@
+"""Tests for OCR image preprocessing."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from utils.ocr import preprocess_image_array
+
+
+def _text_like_image() -> 'np.ndarray':
+    """Build a noisy BGR scan: dark strokes on a light background."""
+    rng = np.random.default_rng(0)
+    gray = np.full((60, 120), 220, dtype=np.int16)
+    gray[20:40, 10:110:8] = 30
+    gray += rng.integers(-20, 20, size=gray.shape, dtype=np.int16)
+    gray = np.clip(gray, 0, 255).astype(np.uint8)
+    return np.stack([gray] * 3, axis=-1)
+
+
+class TestPreprocessImageArray:
+    """Tests for preprocess_image_array."""
+
+    def test_binarizes_bgr_image(self):
+        """Test that a BGR image comes back as a same-size binary image."""
+        image = _text_like_image()
+
+        result = preprocess_image_array(image)
+
+        assert result.shape == image.shape[:2]
+        assert result.dtype == np.uint8
+        assert set(np.unique(result)) <= {0, 255}
+        # Strokes stay dark and the background turns white
+        assert result[30, 10] == 0
+        assert result[5, 5] == 255
+
+    def test_accepts_grayscale_image(self):
+        """Test that a single-channel image is used as is."""
+        image = _text_like_image()[:, :, 0]
+
+        assert preprocess_image_array(image).shape == image.shape
+
+    def test_unreadable_path_raises(self, tmp_path):
+        """Test that a path OpenCV can't read raises ValueError."""
+        with pytest.raises(ValueError, match="Could not read image"):
+            preprocess_image_array(str(tmp_path / "missing.png"))
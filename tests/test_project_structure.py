@@ -5,14 +5,28 @@ import pytest
 from pathlib import Path
 
 
+@pytest.fixture(scope="module")
+def project_root():
+    """Get project root directory."""
+    return Path(__file__).parent.parent
+
+
+@pytest.fixture(scope="module")
+def project_files(project_root):
+    """Read the files whose contents are checked, once for the module."""
+    names = [
+        ".gitignore",
+        "requirements.txt",
+        "core/__init__.py",
+        "spiders/__init__.py",
+        "utils/__init__.py",
+    ]
+    return {name: (project_root / name).read_text() for name in names}
+
+
 class TestProjectStructure:
     """Test that project structure is correctly set up."""
 
-    @pytest.fixture
-    def project_root(self):
-        """Get project root directory."""
-        return Path(__file__).parent.parent
-
     def test_required_directories_exist(self, project_root):
         """Test that all required directories exist."""
         required_dirs = [
@@ -50,11 +64,9 @@ class TestProjectStructure:
             assert file_path.exists(), f"Required file '{file_name}' does not exist"
             assert file_path.is_file(), f"'{file_name}' exists but is not a file"
 
-    def test_gitignore_patterns(self, project_root):
+    def test_gitignore_patterns(self, project_files):
         """Test that .gitignore contains essential patterns."""
-        gitignore_path = project_root / ".gitignore"
-        with open(gitignore_path, "r") as f:
-            content = f.read()
+        content = project_files[".gitignore"]
         
         essential_patterns = [
             "__pycache__",
@@ -70,16 +82,17 @@ class TestProjectStructure:
         for pattern in essential_patterns:
             assert pattern in content, f"Essential pattern '{pattern}' not in .gitignore"
 
-    def test_requirements_file_not_empty(self, project_root):
+    def test_requirements_file_not_empty(self, project_files):
         """Test that requirements.txt is not empty."""
-        req_path = project_root / "requirements.txt"
-        with open(req_path, "r") as f:
-            lines = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        lines = [
+            line.strip() for line in project_files["requirements.txt"].splitlines()
+            if line.strip() and not line.startswith("#")
+        ]
         
         assert len(lines) > 0, "requirements.txt is empty"
         assert "playwright" in " ".join(lines).lower(), "playwright not in requirements"
 
-    def test_package_init_files(self, project_root):
+    def test_package_init_files(self, project_files):
         """Test that package __init__.py files are not empty."""
         init_files = [
             "core/__init__.py",
@@ -88,9 +101,7 @@ class TestProjectStructure:
         ]
         
         for init_file in init_files:
-            init_path = project_root / init_file
-            with open(init_path, "r") as f:
-                content = f.read().strip()
+            content = project_files[init_file].strip()
             
             assert len(content) > 0, f"{init_file} is empty"
             assert "__all__" in content or "import" in content, \
@@ -1,6 +1,13 @@
 """Utility modules for Playwright-Async-Crawler-Suite."""
 
-from .ocr import OCREngine, PaddleOCREngine, TesseractEngine, get_ocr_engine, preprocess_image
+from .ocr import (
+    OCREngine,
+    PaddleOCREngine,
+    TesseractEngine,
+    get_ocr_engine,
+    preprocess_image,
+    preprocess_image_array
+)
 from .cleaner import (
     map_fields,
     normalize_whitespace,
@@ -8,8 +15,10 @@ from .cleaner import (
     extract_approval_number,
     extract_drug_code,
     validate_fields,
-    clean_drug_data
+    clean_drug_data,
+    make_cleaner
 )
+from .excel import write_formatted_excel
 
 __all__ = [
     # OCR
@@ -18,6 +27,7 @@ __all__ = [
     "TesseractEngine",
     "get_ocr_engine",
     "preprocess_image",
+    "preprocess_image_array",
     # Cleaner
     "map_fields",
     "normalize_whitespace",
@@ -26,4 +36,7 @@ __all__ = [
     "extract_drug_code",
     "validate_fields",
     "clean_drug_data",
+    "make_cleaner",
+    # Excel
+    "write_formatted_excel",
 ]
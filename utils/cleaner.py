@@ -1,11 +1,77 @@
 """Data cleaning and validation utilities."""
 
+import functools
 import re
 import logging
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Compiled once at import; these run on every field of every scraped record
+_WHITESPACE_RE = re.compile(r'\s+')
+
+_DATE_RES = [
+    # YYYY-MM-DD or YYYY/MM/DD or YYYY.MM.DD
+    re.compile(r'\d{4}[-/\.]\d{1,2}[-/\.]\d{1,2}'),
+    re.compile(r'\d{4}年\d{1,2}月\d{1,2}日'),
+]
+
+# Approval numbers (adjust based on actual format)
+_APPROVAL_RES = [
+    re.compile(r'[国进]药准字[A-Z]\d{8}'),
+    re.compile(r'[A-Z]\d{8}'),
+]
+
+_DRUG_CODE_RE = re.compile(r'\d{12,20}')
+
+def _field_index(field_mapping: Dict[str, List[str]]) -> Tuple[List[str], Dict[str, List[Tuple[str, int]]]]:
+    """Return the reverse index for a field mapping.
+    
+    The index is cached on a snapshot of the mapping's contents, so a
+    mapping changed in place gets a fresh index.
+    
+    Args:
+        field_mapping: Standard field name -> accepted label variations
+        
+    Returns:
+        Tuple of (standard field names, {label: [(standard name, rank)]})
+    """
+    return _build_field_index(
+        tuple((standard_name, tuple(variations)) for standard_name, variations in field_mapping.items())
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _build_field_index(
+    field_mapping: Tuple[Tuple[str, Tuple[str, ...]], ...]
+) -> Tuple[List[str], Dict[str, List[Tuple[str, int]]]]:
+    """Build the reverse index for a field mapping snapshot.
+    
+    Every variation is indexed bare and with both colon styles. The rank
+    orders them the way map_fields always tried them, so the earliest
+    variation keeps precedence. A label shared by several standard names
+    maps to all of them.
+    
+    Args:
+        field_mapping: (standard field name, label variations) pairs
+        
+    Returns:
+        Tuple of (standard field names, {label: [(standard name, rank)]})
+    """
+    index: Dict[str, List[Tuple[str, int]]] = {}
+    for standard_name, variations in field_mapping:
+        seen = set()
+        rank = 0
+        for variation in variations:
+            for key in (variation, variation + ':', variation + '：'):
+                if key not in seen:
+                    seen.add(key)
+                    index.setdefault(key, []).append((standard_name, rank))
+                rank += 1
+    
+    standard_names = [standard_name for standard_name, _ in field_mapping]
+    return standard_names, index
+
 
 def map_fields(raw_data: Dict, field_mapping: Dict[str, List[str]]) -> Dict:
     """Map extracted fields to standard field names.
@@ -17,21 +83,18 @@ def map_fields(raw_data: Dict, field_mapping: Dict[str, List[str]]) -> Dict:
     Returns:
         Dictionary with mapped field names
     """
-    mapped_data = {}
+    standard_names, field_index = _field_index(field_mapping)
     
-    for standard_name, variations in field_mapping.items():
-        for variation in variations:
-            # Try with and without colon
-            for key in [variation, variation + ':', variation + '：']:
-                if key in raw_data:
-                    mapped_data[standard_name] = raw_data[key]
-                    break
-            if standard_name in mapped_data:
-                break
-        
-        # Set empty string if not found
-        if standard_name not in mapped_data:
-            mapped_data[standard_name] = ''
+    mapped_data = dict.fromkeys(standard_names, '')
+    best_rank: Dict[str, int] = {}
+    
+    # One lookup per raw key; when several keys map to the same field,
+    # the earliest variation in the mapping wins
+    for key, value in raw_data.items():
+        for standard_name, rank in field_index.get(key, ()):
+            if rank < best_rank.get(standard_name, rank + 1):
+                best_rank[standard_name] = rank
+                mapped_data[standard_name] = value
     
     return mapped_data
 
@@ -48,19 +111,16 @@ def normalize_whitespace(text: str) -> str:
     if not text:
         return ''
     
-    # Remove leading/trailing whitespace
     text = text.strip()
     
-    # Collapse multiple spaces
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Remove newlines and tabs
-    text = text.replace('\n', ' ').replace('\t', ' ').replace('\r', ' ')
-    
-    # Collapse again after replacements
-    text = re.sub(r'\s+', ' ', text)
+    # Every whitespace character except ' ' is unprintable, so a printable
+    # string without double spaces is already normalized
+    if text.isprintable() and '  ' not in text:
+        return text
     
-    return text.strip()
+    # \s covers newlines, tabs and carriage returns, so one pass collapses
+    # every run of whitespace into a single space
+    return _WHITESPACE_RE.sub(' ', text)
 
 
 def extract_date(text: str) -> Optional[str]:
@@ -72,14 +132,8 @@ def extract_date(text: str) -> Optional[str]:
     Returns:
         Extracted date string or None
     """
-    # Pattern for YYYY-MM-DD or YYYY/MM/DD or YYYY.MM.DD
-    patterns = [
-        r'\d{4}[-/\.]\d{1,2}[-/\.]\d{1,2}',
-        r'\d{4}年\d{1,2}月\d{1,2}日',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text)
+    for pattern in _DATE_RES:
+        match = pattern.search(text)
         if match:
             return match.group(0)
     
@@ -95,14 +149,8 @@ def extract_approval_number(text: str) -> Optional[str]:
     Returns:
         Extracted approval number or None
     """
-    # Pattern for approval numbers (adjust based on actual format)
-    patterns = [
-        r'[国进]药准字[A-Z]\d{8}',
-        r'[A-Z]\d{8}',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text)
+    for pattern in _APPROVAL_RES:
+        match = pattern.search(text)
         if match:
             return match.group(0)
     
@@ -118,9 +166,7 @@ def extract_drug_code(text: str) -> Optional[str]:
     Returns:
         Extracted drug code or None
     """
-    # Pattern for drug codes
-    pattern = r'\d{12,20}'
-    match = re.search(pattern, text)
+    match = _DRUG_CODE_RE.search(text)
     
     if match:
         return match.group(0)
@@ -138,11 +184,8 @@ def validate_fields(data: Dict, required_fields: List[str]) -> Dict:
     Returns:
         Dictionary with validation results
     """
-    missing_fields = []
-    
-    for field in required_fields:
-        if not data.get(field):
-            missing_fields.append(field)
+    get = data.get
+    missing_fields = [field for field in required_fields if not get(field)]
     
     total_fields = len(required_fields)
     present_fields = total_fields - len(missing_fields)
@@ -157,11 +200,31 @@ def validate_fields(data: Dict, required_fields: List[str]) -> Dict:
     }
 
 
-def clean_drug_data(data: Dict) -> Dict:
-    """Clean and normalize drug data.
+# Records share a small set of field names, so each is classified only once
+@functools.lru_cache(maxsize=1024)
+def _field_extractor(key: str) -> Optional[Callable[[str], Optional[str]]]:
+    """Pick the structured-data extractor for a field from its name.
+    
+    Args:
+        key: Field name
+        
+    Returns:
+        extract_date, extract_approval_number, or None for plain fields
+    """
+    if '日期' in key or 'date' in key.lower():
+        return extract_date
+    if '批准' in key or 'approval' in key.lower():
+        return extract_approval_number
+    return None
+
+
+def _clean_record(data: Dict, extractors: Dict[str, Optional[Callable[[str], Optional[str]]]]) -> Dict:
+    """Clean one record using already classified field names.
     
     Args:
         data: Raw drug data
+        extractors: Field name -> extractor; missing names are classified
+            on the fly
         
     Returns:
         Cleaned drug data
@@ -174,21 +237,52 @@ def clean_drug_data(data: Dict) -> Dict:
             value = normalize_whitespace(value)
             
             # Extract structured data if applicable
-            if '日期' in key or 'date' in key.lower():
-                extracted_date = extract_date(value)
-                if extracted_date:
-                    value = extracted_date
-            
-            elif '批准' in key or 'approval' in key.lower():
-                extracted_approval = extract_approval_number(value)
-                if extracted_approval:
-                    value = extracted_approval
+            extract = extractors[key] if key in extractors else _field_extractor(key)
+            if extract is not None:
+                extracted = extract(value)
+                if extracted:
+                    value = extracted
         
         cleaned[key] = value
     
     return cleaned
 
 
+def make_cleaner(field_names: Iterable[str]) -> Callable[[Dict], Dict]:
+    """Build a clean_drug_data() equivalent for records with a known schema.
+    
+    Each field name is classified once here instead of on every record.
+    Fields outside the schema are still cleaned, just classified per call.
+    
+    Args:
+        field_names: Field names the records are expected to have
+        
+    Returns:
+        Function taking a raw record and returning the cleaned record
+    """
+    extractors = {name: _field_extractor(name) for name in field_names}
+    
+    def clean(data: Dict) -> Dict:
+        return _clean_record(data, extractors)
+    
+    return clean
+
+
+def clean_drug_data(data: Dict) -> Dict:
+    """Clean and normalize drug data.
+    
+    Use make_cleaner() instead when cleaning many records with the same
+    fields.
+    
+    Args:
+        data: Raw drug data
+        
+    Returns:
+        Cleaned drug data
+    """
+    return _clean_record(data, {})
+
+
 __all__ = [
     'map_fields',
     'normalize_whitespace',
@@ -196,5 +290,6 @@ __all__ = [
     'extract_approval_number',
     'extract_drug_code',
     'validate_fields',
-    'clean_drug_data'
+    'clean_drug_data',
+    'make_cleaner'
 ]
@@ -0,0 +1,74 @@
+"""Formatted Excel export shared by the spiders."""
+
+import logging
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def write_formatted_excel(
+    df: 'pd.DataFrame',
+    filename: str,
+    sheet_name: str,
+    header_format: Dict[str, Any],
+    row_formats: Tuple[Dict[str, Any], Dict[str, Any]],
+    max_column_width: Optional[int] = None,
+    freeze_header: bool = False
+) -> None:
+    """Write a DataFrame to a formatted Excel file (blocking).
+
+    Rows alternate between the two row formats and columns are sized to
+    their longest cell. Run it in an executor from async code.
+
+    Args:
+        df: DataFrame to save
+        filename: Output .xlsx path
+        sheet_name: Worksheet name
+        header_format: xlsxwriter format properties for the header row
+        row_formats: Format properties for even and odd data rows
+        max_column_width: Upper bound on column widths, if any
+        freeze_header: Keep the header row visible while scrolling
+    """
+    # Only needed when a workbook is written, so kept out of module import
+    import numpy as np
+    import pandas as pd
+    import xlsxwriter
+
+    with xlsxwriter.Workbook(filename) as workbook:
+        worksheet = workbook.add_worksheet(sheet_name)
+
+        # Register formats once per workbook; row formats are indexed by
+        # row parity
+        header = workbook.add_format(header_format)
+        rows = tuple(workbook.add_format(row_format) for row_format in row_formats)
+
+        # Write headers
+        worksheet.write_row(0, 0, [str(col) for col in df.columns], header)
+
+        # Write data with alternating colors, one write_row() call per
+        # row; missing values are blanked in the array up front
+        values = df.to_numpy(dtype=object, copy=True)
+        values[pd.isna(values)] = ''
+        for row_num, row in enumerate(values.tolist()):
+            worksheet.write_row(row_num + 1, 0, row, rows[row_num & 1])
+
+        # Auto-adjust column widths; cell lengths are measured for the
+        # whole frame in one vectorized pass
+        if len(df):
+            content_widths = np.char.str_len(values.astype(str)).max(axis=0)
+        else:
+            content_widths = np.zeros(len(df.columns), dtype=int)
+        for i, col in enumerate(df.columns):
+            column_width = max(len(str(col)), int(content_widths[i])) + 3
+            if max_column_width is not None:
+                column_width = min(column_width, max_column_width)
+            worksheet.set_column(i, i, column_width)
+
+        if freeze_header:
+            worksheet.freeze_panes(1, 0)
+
+
+__all__ = ['write_formatted_excel']
@@ -1,86 +1,187 @@
 """OCR utilities for text extraction from images and PDFs."""
 
+import asyncio
+import functools
 import logging
+import os
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 from pathlib import Path
 
+if TYPE_CHECKING:
+    import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# A path to an image file, or an image already decoded by OpenCV
+ImageSource = Union[str, 'np.ndarray']
+
 
 class OCREngine(ABC):
     """Abstract base class for OCR engines."""
     
     @abstractmethod
-    async def extract_text(self, image_path: str) -> Dict[str, any]:
+    async def extract_text(self, image_path: ImageSource) -> Dict[str, any]:
         """Extract text from image.
         
         Args:
-            image_path: Path to image file
+            image_path: Path to image file, or a decoded image array
             
         Returns:
             Dictionary with 'text' and 'confidence' keys
         """
         pass
+    
+    async def batch_extract(
+        self,
+        image_paths: List[ImageSource],
+        concurrency: Optional[int] = None
+    ) -> List[Dict[str, any]]:
+        """Extract text from several images concurrently.
+        
+        Engines that can do better than one call per image override this.
+        
+        Args:
+            image_paths: Paths to image files, or decoded image arrays
+            concurrency: Maximum images in flight (default: CPU count)
+            
+        Returns:
+            One extract_text() result per image, in input order
+        """
+        semaphore = asyncio.Semaphore(concurrency or os.cpu_count() or 1)
+        
+        async def extract_one(image_path: ImageSource) -> Dict[str, any]:
+            async with semaphore:
+                return await self.extract_text(image_path)
+        
+        return list(await asyncio.gather(*(extract_one(path) for path in image_paths)))
 
 
 class PaddleOCREngine(OCREngine):
     """PaddleOCR implementation."""
     
-    def __init__(self):
-        """Initialize PaddleOCR engine."""
+    # Loaded models keyed by language, shared by every engine instance so
+    # the weights are only loaded and held in memory once per process
+    _models: Dict[str, any] = {}
+    # The Paddle predictor isn't safe to call from several threads at once,
+    # and engines share it, so the lock is shared too
+    _lock = threading.Lock()
+    
+    def __init__(self, lang: str = 'ch'):
+        """Initialize PaddleOCR engine.
+        
+        Args:
+            lang: PaddleOCR recognition language
+        """
+        self.lang = lang
         self.ocr = None
         logger.info("PaddleOCREngine initialized (lazy loading)")
     
     def _ensure_loaded(self):
-        """Lazy load PaddleOCR."""
+        """Lazy load PaddleOCR, reusing a model another engine already loaded.
+        
+        Called with _lock held.
+        """
         if self.ocr is None:
-            try:
-                from paddleocr import PaddleOCR
-                self.ocr = PaddleOCR(use_angle_cls=True, lang='ch')
-                logger.info("PaddleOCR loaded successfully")
-            except ImportError:
-                logger.error("PaddleOCR not installed. Install with: pip install paddleocr")
-                raise
-    
-    async def extract_text(self, image_path: str) -> Dict[str, any]:
-        """Extract text using PaddleOCR.
+            model = self._models.get(self.lang)
+            if model is None:
+                try:
+                    from paddleocr import PaddleOCR
+                    model = PaddleOCR(use_angle_cls=True, lang=self.lang)
+                    logger.info("PaddleOCR loaded successfully")
+                except ImportError:
+                    logger.error("PaddleOCR not installed. Install with: pip install paddleocr")
+                    raise
+                self._models[self.lang] = model
+            self.ocr = model
+    
+    @staticmethod
+    def _parse_result(result) -> Dict[str, any]:
+        """Join the recognized lines of one PaddleOCR result.
         
         Args:
-            image_path: Path to image file
+            result: Return value of PaddleOCR.ocr() for a single image
             
         Returns:
             Dictionary with extracted text and confidence
         """
-        self._ensure_loaded()
+        if not result or not result[0]:
+            return {'text': '', 'confidence': 0.0}
         
-        try:
-            result = self.ocr.ocr(image_path, cls=True)
-            
-            if not result or not result[0]:
-                return {'text': '', 'confidence': 0.0}
-            
-            # Extract text and confidence
-            texts = []
-            confidences = []
+        # Each line is [box, (text, confidence)]
+        lines = result[0]
+        full_text = '\n'.join([line[1][0] for line in lines])
+        avg_confidence = sum(line[1][1] for line in lines) / len(lines)
+        
+        return {
+            'text': full_text,
+            'confidence': avg_confidence
+        }
+    
+    def _run_ocr(self, image_paths: List[ImageSource]) -> List[Dict[str, any]]:
+        """Load the model if needed and OCR each image (blocking).
+        
+        Runs in the default executor. A failed image yields an empty
+        result instead of aborting the rest of the batch.
+        
+        Args:
+            image_paths: Paths to image files, or decoded image arrays
             
-            for line in result[0]:
-                text = line[1][0]
-                confidence = line[1][1]
-                texts.append(text)
-                confidences.append(confidence)
+        Returns:
+            One result per image, in input order
+        """
+        with self._lock:
+            self._ensure_loaded()
             
-            full_text = '\n'.join(texts)
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+            results = []
+            for image_path in image_paths:
+                try:
+                    results.append(self._parse_result(self.ocr.ocr(image_path, cls=True)))
+                except Exception as e:
+                    source = image_path if isinstance(image_path, str) else 'in-memory image'
+                    logger.error(f"PaddleOCR extraction failed for {source}: {e}")
+                    results.append({'text': '', 'confidence': 0.0})
+            return results
+    
+    async def extract_text(self, image_path: ImageSource) -> Dict[str, any]:
+        """Extract text using PaddleOCR.
+        
+        Inference runs in the default executor so the event loop keeps
+        serving pages meanwhile.
+        
+        Args:
+            image_path: Path to image file, or a decoded image array
             
-            return {
-                'text': full_text,
-                'confidence': avg_confidence
-            }
+        Returns:
+            Dictionary with extracted text and confidence
+        """
+        results = await self.batch_extract([image_path])
+        return results[0]
+    
+    async def batch_extract(
+        self,
+        image_paths: List[ImageSource],
+        concurrency: Optional[int] = None
+    ) -> List[Dict[str, any]]:
+        """Extract text from several images in one executor job.
+        
+        PaddleOCR only accepts a list of images with detection turned off,
+        so the images are still recognized one by one, but the whole batch
+        costs a single thread hand-off and one pass through the lock.
+        
+        Args:
+            image_paths: Paths to image files, or decoded image arrays
+            concurrency: Ignored; the shared predictor runs one image at a
+                time
             
-        except Exception as e:
-            logger.error(f"PaddleOCR extraction failed: {e}")
-            return {'text': '', 'confidence': 0.0}
+        Returns:
+            One result per image, in input order
+        """
+        if not image_paths:
+            return []
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._run_ocr, list(image_paths))
 
 
 class TesseractEngine(OCREngine):
@@ -90,11 +191,11 @@ class TesseractEngine(OCREngine):
         """Initialize Tesseract engine."""
         logger.info("TesseractEngine initialized")
     
-    async def extract_text(self, image_path: str) -> Dict[str, any]:
-        """Extract text using Tesseract.
+    def _extract_sync(self, image_path: ImageSource) -> Dict[str, any]:
+        """Run Tesseract on one image (blocking).
         
         Args:
-            image_path: Path to image file
+            image_path: Path to image file, or a decoded image array
             
         Returns:
             Dictionary with extracted text and confidence
@@ -103,7 +204,10 @@ class TesseractEngine(OCREngine):
             import pytesseract
             from PIL import Image
             
-            image = Image.open(image_path)
+            if isinstance(image_path, str):
+                image = Image.open(image_path)
+            else:
+                image = Image.fromarray(image_path)
             text = pytesseract.image_to_string(image, lang='chi_sim+eng')
             
             # Tesseract doesn't provide confidence easily, use 0.8 as default
@@ -118,10 +222,63 @@ class TesseractEngine(OCREngine):
         except Exception as e:
             logger.error(f"Tesseract extraction failed: {e}")
             return {'text': '', 'confidence': 0.0}
+    
+    async def extract_text(self, image_path: ImageSource) -> Dict[str, any]:
+        """Extract text using Tesseract.
+        
+        Each call runs a tesseract process from the default executor, so
+        batch_extract() OCRs several images in parallel.
+        
+        Args:
+            image_path: Path to image file, or a decoded image array
+            
+        Returns:
+            Dictionary with extracted text and confidence
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._extract_sync, image_path)
+
+
+def preprocess_image_array(image: ImageSource) -> 'np.ndarray':
+    """Preprocess an image for OCR without writing anything to disk.
+    
+    The grayscale image is denoised before Otsu thresholding; denoising
+    an already binarized image removes little and costs just as much.
+    The result can be passed straight to an engine's extract_text().
+    
+    Args:
+        image: Path to input image, or a BGR image array
+        
+    Returns:
+        Binarized single-channel uint8 image
+        
+    Raises:
+        ValueError: If the image file can't be read
+    """
+    import cv2
+    
+    # Read image
+    img = cv2.imread(image) if isinstance(image, str) else image
+    if img is None:
+        raise ValueError(f"Could not read image: {image}")
+    
+    # Convert to grayscale
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    
+    # Denoise
+    denoised = cv2.fastNlMeansDenoising(gray)
+    
+    # Apply thresholding
+    _, thresh = cv2.threshold(denoised, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    
+    return thresh
 
 
 def preprocess_image(image_path: str, output_path: Optional[str] = None) -> str:
-    """Preprocess image for better OCR results.
+    """Preprocess image for better OCR results and save it as PNG.
+    
+    Prefer preprocess_image_array() when the result only goes to OCR;
+    it skips the PNG encode, the write and the decode on the way back.
     
     Args:
         image_path: Path to input image
@@ -131,27 +288,15 @@ def preprocess_image(image_path: str, output_path: Optional[str] = None) -> str:
         Path to preprocessed image
     """
     try:
-        from PIL import Image, ImageEnhance
         import cv2
-        import numpy as np
         
-        # Read image
-        img = cv2.imread(image_path)
-        
-        # Convert to grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
-        # Apply thresholding
-        _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        
-        # Denoise
-        denoised = cv2.fastNlMeansDenoising(thresh)
+        thresh = preprocess_image_array(image_path)
         
         # Save
         if output_path is None:
             output_path = str(Path(image_path).with_suffix('.preprocessed.png'))
         
-        cv2.imwrite(output_path, denoised)
+        cv2.imwrite(output_path, thresh)
         logger.info(f"Preprocessed image saved to: {output_path}")
         
         return output_path
@@ -161,9 +306,13 @@ def preprocess_image(image_path: str, output_path: Optional[str] = None) -> str:
         return image_path  # Return original if preprocessing fails
 
 
+@functools.lru_cache(maxsize=4)
 def get_ocr_engine(engine_type: str = 'paddle') -> OCREngine:
     """Factory function to get OCR engine.
     
+    Engines are cached per engine_type, so repeated calls return the same
+    instance instead of a fresh one that would load its own model.
+    
     Args:
         engine_type: 'paddle' or 'tesseract'
         
@@ -187,5 +336,6 @@ __all__ = [
     'PaddleOCREngine',
     'TesseractEngine',
     'preprocess_image',
+    'preprocess_image_array',
     'get_ocr_engine'
 ]